@@ -0,0 +1 @@
+"""Benchmarks of the game internals, run them from the src folder with python -m."""
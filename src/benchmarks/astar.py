@@ -0,0 +1,143 @@
+"""
+Benchmark of the native A star against the pathfinding package based version.
+
+Run from the src folder:
+    python -m benchmarks.astar --queries=200
+"""
+from functools import partial
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+import fire  # type: ignore
+import pygame
+from game.algorithms import a_star
+from game.algorithms.flow_field import FlowField
+from game.settings import Game
+from game.walls import WallGroup
+from game.utils.mapfile import read_map
+from game.utils.mapgen import generate_map
+
+try:
+    from pathfinding.core.diagonal_movement import DiagonalMovement  # type: ignore # pylint: disable=import-error
+    from pathfinding.core.grid import Grid  # type: ignore # pylint: disable=import-error
+    from pathfinding.finder.a_star import AStarFinder  # type: ignore # pylint: disable=import-error
+except ImportError:
+    Grid = None
+
+_MAP_FILE = 'maps/map_1.csv'
+_SYNTHETIC_SIZES = ((64, 64), (256, 256))
+# sparse enough for most random pairs of nodes to be connected
+_SYNTHETIC_BREAKABLE = 0.1
+
+
+def legacy_get_path(mapdata: list, player_node: tuple, enemy_node: tuple) -> list:
+    """The former `a_star.get_path` built on the pathfinding package."""
+    grid = Grid(matrix=a_star._encode_map(mapdata))  # pylint: disable=protected-access
+    finder = AStarFinder(diagonal_movement=DiagonalMovement.always)
+    player_on_grid = grid.node(*player_node)
+    enemy_on_grid = grid.node(*enemy_node)
+    path, _ = finder.find_path(player_on_grid, enemy_on_grid, grid)
+    return path
+
+
+def _queries(mapdata: list, count: int, seed: int) -> List[Tuple[tuple, tuple]]:
+    """random pairs of walkable nodes"""
+    rng = random.Random(seed)
+    encoded_map = a_star._encode_map(mapdata)  # pylint: disable=protected-access
+    walkable = [(column, row) for row, cells in enumerate(encoded_map)
+                for column, cell in enumerate(cells) if cell]
+    return [(rng.choice(walkable), rng.choice(walkable)) for _ in range(count)]
+
+
+def _time_per_query(find: Callable[[tuple, tuple], list],
+                    queries: List[Tuple[tuple, tuple]]) -> Tuple[float, float]:
+    """mean milliseconds per query and mean path length"""
+    length = 0
+    start = time.perf_counter()
+    for start_node, goal_node in queries:
+        length += len(find(start_node, goal_node))
+    elapsed = time.perf_counter() - start
+    return elapsed / len(queries) * 1e3, length / len(queries)
+
+
+class _BlockedCell(pygame.sprite.Sprite):
+    # pylint: disable=too-few-public-methods
+    """stand-in wall blocking a cell of the flow field"""
+
+    def __init__(self, rect: pygame.Rect):
+        super().__init__()
+        self.rect = rect
+
+
+def check_distances(finder: a_star.AStar, queries: List[Tuple[tuple, tuple]]):
+    """
+    Asserts that the paths of A star are as short as the breadth first search of `FlowField`.
+
+    Parameters
+    ----------
+    finder: a_star.AStar
+        grid of the map
+    queries: List[Tuple[tuple, tuple]]
+        (start, goal) pairs of (column, row) nodes
+    """
+    tile_size = Game.TILE_SIZE.value
+    walls = WallGroup()
+    for index, walkable in enumerate(finder.walkable):
+        if not walkable:
+            column, row = index % finder.columns, index // finder.columns
+            walls.add(_BlockedCell(pygame.Rect(column * tile_size, row * tile_size,
+                                               tile_size, tile_size)))
+    flow_field = FlowField(walls, finder.columns, finder.rows)
+    for start_node, goal_node in queries:
+        path = finder.find_path(start_node, goal_node)
+        flow_field.set_target(goal_node)
+        expected = flow_field.distance(start_node)
+        distance = len(path) - 1 if path else None
+        assert distance == expected, \
+            f"A star found {distance} steps from {start_node} to {goal_node}, BFS {expected}"
+
+
+def run(queries: int = 100, seed: int = 0, legacy_limit: Optional[int] = 20,
+        check_limit: Optional[int] = 20):
+    # pylint: disable=too-many-locals
+    """
+    Times path queries between random walkable nodes.
+
+    The path lengths of the first queries are checked against the flow field
+    breadth first search, the run fails when A star returns a longer path.
+
+    Parameters
+    ----------
+    queries: int
+        number of path queries per map
+    seed: int
+        seed for the queries and the synthetic maps
+    legacy_limit: Optional[int]
+        at most this many queries are timed with the slow pathfinding package
+    check_limit: Optional[int]
+        at most this many queries are checked against the flow field
+    """
+    maps = [(_MAP_FILE, read_map(_MAP_FILE))]
+    for columns, rows in _SYNTHETIC_SIZES:
+        maps.append((f'synthetic {columns}x{rows}', generate_map(columns, rows, seed,
+                                                                 _SYNTHETIC_BREAKABLE)))
+
+    print(f"{'map':<20}{'implementation':<28}{'ms/query':>10}{'path length':>13}")
+    for name, mapdata in maps:
+        pairs = _queries(mapdata, queries, seed)
+        reused = a_star.AStar.from_map(mapdata)
+        results: List[Tuple[str, Callable[[tuple, tuple], list], List]] = [
+            ('a_star.get_path', partial(a_star.get_path, mapdata), pairs),
+            ('AStar.find_path (reused)', reused.find_path, pairs),
+        ]
+        if Grid is not None:
+            results.append(('pathfinding package', partial(legacy_get_path, mapdata),
+                            pairs[:legacy_limit]))
+        for label, find, timed_pairs in results:
+            milliseconds, length = _time_per_query(find, timed_pairs)
+            print(f"{name:<20}{label:<28}{milliseconds:>10.3f}{length:>13.1f}")
+        check_distances(reused, pairs[:check_limit])
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,258 @@
+"""
+Frame time benchmark of levels on the csv map and on synthetic maps up to 512x512.
+
+Every map is played headless for a number of frames with scripted inputs, the
+report holds the setup time, frames per second, per phase timings and the peak
+memory. Saved results can serve as the baseline of later runs, a run fails when
+any metric got worse than the baseline by more than the tolerance. An untimed
+run of every map checks the danger map against the blasts which happen.
+
+Run from the src folder:
+    python -m benchmarks.suite --frames=600 --save_baseline=baseline.json
+    python -m benchmarks.suite --frames=600 --baseline=baseline.json
+"""
+import json
+from pathlib import Path
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Sequence, Tuple
+import fire  # type: ignore
+import numpy as np
+import pygame
+from game import level
+from game.profiler import FrameProfiler
+from game.settings import Game, GameWindow
+from game.simulation import ScriptedControls
+from game.utils.mapfile import read_map
+from game.utils.mapgen import generate_map, write_map
+
+_MAP_FILE = 'maps/map_1.csv'
+# columns x rows of the synthetic maps, the smallest one matches the csv map
+_SIZES = "32x13,64x64,128x128,256x256,512x512"
+# keys the scripted player holds down, each for _HOLD_FRAMES frames
+# pylint: disable=no-member
+_INPUTS: Sequence[Tuple[int, ...]] = ((pygame.K_RIGHT,), (pygame.K_DOWN,), (pygame.K_LEFT,),
+                                      (pygame.K_UP,), (pygame.K_x,), ())
+# pylint: enable=no-member
+_HOLD_FRAMES = 20
+# timings within this many milliseconds of the baseline are noise, not regressions
+_SLACK_MS = 0.05
+_SLACK_MB = 1.0
+
+# metric -> value of a single map
+Metrics = Dict[str, float]
+
+
+def _parse_sizes(sizes: str) -> List[Tuple[int, int]]:
+    """(columns, rows) of comma separated sizes like 64x32"""
+    parsed = []
+    for size in str(sizes).split(','):
+        columns, rows = size.lower().split('x')
+        parsed.append((int(columns), int(rows)))
+    return parsed
+
+
+def _scripted_inputs(frames: int, seed: int) -> List[Tuple[int, ...]]:
+    """pressed keys for every frame, random but the same for every run with the seed"""
+    rng = random.Random(seed)
+    inputs: List[Tuple[int, ...]] = []
+    while len(inputs) < frames:
+        inputs.extend([rng.choice(_INPUTS)] * _HOLD_FRAMES)
+    return inputs[:frames]
+
+
+def _play(layout: List, frames: int, seed: int, options: Dict) -> Tuple[float, float,
+                                                                          FrameProfiler]:
+    """
+    sets up the level and plays the frames
+
+    Returns
+    -------
+    Tuple[float, float, FrameProfiler]
+        milliseconds to set the level up, seconds to play the frames and the
+        timings of the frames
+    """
+    controls = ScriptedControls()
+    surface = None
+    if options["render"]:
+        surface = pygame.Surface((GameWindow.SCREEN_WIDTH.value, GameWindow.SCREEN_HEIGHT.value))
+    start = time.perf_counter()
+    level_map = level.Level(layout, surface, 1, seed=seed, controls=controls,
+                            smart_enemies=options["smart_enemies"],
+                            enemy_count=options["enemies"])
+    setup_ms = (time.perf_counter() - start) * 1e3
+
+    profiler = FrameProfiler(window=frames)
+    level_map.profiler = profiler
+    advance = level_map.run if options["render"] else level_map.step
+    start = time.perf_counter()
+    for pressed_keys in _scripted_inputs(frames, seed):
+        controls.press(pressed_keys)
+        profiler.start_frame()
+        advance()
+        profiler.end_frame()
+    return setup_ms, time.perf_counter() - start, profiler
+
+
+def _measure(layout: List, frames: int, seed: int, options: Dict) -> Metrics:
+    """timings of a map, followed by a traced run for the peak memory"""
+    setup_ms, seconds, profiler = _play(layout, frames, seed, options)
+    metrics = {"setup_ms": setup_ms, "fps": frames / seconds}
+    for phase, stats in profiler.summary().items():
+        for statistic in ("mean", "p95"):
+            metrics[f"{phase}_{statistic}_ms"] = stats[statistic]
+    if options["memory"]:
+        # tracing slows everything down, so it gets a run of its own
+        tracemalloc.start()
+        _play(layout, frames, seed, options)
+        metrics["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return metrics
+
+
+def _exploding_cells(level_map: level.Level) -> np.ndarray:
+    """(rows, columns) mask of the map cells covered by a blast"""
+    rows, columns = level_map.danger_map.ticks.shape
+    # blasts of bombs placed off the map are not tracked by the danger map
+    cells = level_map.explosion_layer.tiles // Game.TILE_SIZE.value
+    cells = cells[(cells >= 0).all(axis=1) & (cells[:, 0] < columns) & (cells[:, 1] < rows)]
+    exploding = np.zeros((rows, columns), dtype=bool)
+    exploding[cells[:, 1], cells[:, 0]] = True
+    return exploding
+
+
+def _check_danger_map(layout: List, frames: int, seed: int, options: Dict):
+    """
+    plays the frames untimed and asserts that every blast reaching a cell of the
+    map was predicted by the danger map for exactly that tick, and that every
+    predicted blast happened
+    """
+    controls = ScriptedControls()
+    level_map = level.Level(layout, None, 1, seed=seed, controls=controls,
+                            smart_enemies=options["smart_enemies"],
+                            enemy_count=options["enemies"])
+    exploding = _exploding_cells(level_map)
+    for pressed_keys in _scripted_inputs(frames, seed):
+        controls.press(pressed_keys)
+        predicted = level_map.danger_map.ticks.copy()
+        level_map.step()
+        tick = level_map.clock.ticks
+        exploded, exploding = exploding, _exploding_cells(level_map)
+        started = exploding & ~exploded
+        assert (predicted[started] == tick).all(), \
+            f"unpredicted blast at tick {tick} in (row, column) {np.argwhere(started).tolist()}"
+        due = predicted == tick
+        assert exploding[due].all(), \
+            f"predicted blast missing at tick {tick} in (row, column) " \
+            f"{np.argwhere(due & ~exploding).tolist()}"
+
+
+def _is_regression(metric: str, value: float, reference: float, tolerance: float) -> bool:
+    """checks if a metric got worse than its baseline value by more than the tolerance"""
+    if metric == "fps":
+        return value < reference / (1 + tolerance)
+    slack = _SLACK_MB if metric.endswith("_mb") else _SLACK_MS
+    return value > reference * (1 + tolerance) + slack
+
+
+def _regressions(results: Dict[str, Metrics], baseline: Dict[str, Metrics],
+                 tolerance: float) -> List[str]:
+    """descriptions of the metrics worse than in the baseline"""
+    failures = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(name, {}).get(metric)
+            if reference is not None and _is_regression(metric, value, reference, tolerance):
+                failures.append(f"{name} {metric}: {value:.3f} (baseline {reference:.3f})")
+    return failures
+
+
+def _print_report(name: str, metrics: Metrics):
+    """prints the metrics of a map"""
+    memory = metrics.get("peak_memory_mb")
+    print(f"{name:<12}{metrics['setup_ms']:>12.1f}{metrics['fps']:>10.0f}"
+          f"{metrics['frame_p95_ms']:>10.3f}" + (f"{memory:>12.1f}" if memory is not None else ""))
+    for metric, value in metrics.items():
+        if metric.startswith(("step.", "draw.")) and metric.endswith("_mean_ms"):
+            print(f"{'':<12}{metric[:-len('_mean_ms')]:<28}{value:>10.4f} ms")
+
+
+def run(*, frames: int = 600, seed: int = 0, sizes: str = _SIZES, breakable: float = 0.35,
+        enemies: int = 3, smart_enemies: bool = False, render: bool = False,
+        memory: bool = True, map_dir: Optional[str] = None, baseline: Optional[str] = None,
+        save_baseline: Optional[str] = None, tolerance: float = 0.3,
+        check_danger: bool = True):
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-locals
+    """
+    Benchmarks the csv map and synthetic maps of the given sizes.
+
+    Parameters
+    ----------
+    frames: int
+        number of frames played on every map
+    seed: int
+        seed for the synthetic maps, the levels and the scripted inputs
+    sizes: str
+        comma separated columns x rows of the synthetic maps, eg. 64x64,512x512
+    breakable: float
+        density of breakable walls on the free cells of the synthetic maps
+    enemies: int
+        number of enemies in every level
+    smart_enemies: bool
+        let the enemies chase the player
+    render: bool
+        draw every frame to an offscreen surface as well
+    memory: bool
+        trace a second run of every map for its peak memory
+    map_dir: Optional[str]
+        folder the synthetic maps are written to as csv
+    baseline: Optional[str]
+        json results of an earlier run, exits with status 1 on regressions
+    save_baseline: Optional[str]
+        file the results are written to, to serve as a later baseline
+    tolerance: float
+        fraction a metric may get worse than the baseline before it counts as regression
+    check_danger: bool
+        play every map once more to check the danger map against the actual blasts
+    """
+    maps = [(Path(_MAP_FILE).stem, read_map(_MAP_FILE))]
+    for columns, rows in _parse_sizes(sizes):
+        layout = generate_map(columns, rows, seed, breakable)
+        maps.append((f"{columns}x{rows}", layout))
+        if map_dir is not None:
+            Path(map_dir).mkdir(parents=True, exist_ok=True)
+            write_map(str(Path(map_dir) / f"synthetic_{columns}x{rows}.csv"), layout)
+
+    options = {"enemies": enemies, "smart_enemies": smart_enemies, "render": render,
+               "memory": memory}
+    print(f"{'map':<12}{'setup ms':>12}{'fps':>10}{'p95 ms':>10}" +
+          (f"{'peak MB':>12}" if memory else ""))
+    results: Dict[str, Metrics] = {}
+    for name, layout in maps:
+        results[name] = _measure(layout, frames, seed, options)
+        _print_report(name, results[name])
+        if check_danger:
+            _check_danger_map(layout, frames, seed, options)
+
+    if save_baseline is not None:
+        with open(save_baseline, "w", encoding="utf-8") as file:
+            json.dump({"frames": frames, "seed": seed, "options": options, "results": results},
+                      file, indent=2)
+    if baseline is not None:
+        with open(baseline, encoding="utf-8") as file:
+            reference = json.load(file)
+        if reference["frames"] != frames or reference["seed"] != seed:
+            print("warning: the baseline was recorded with other frames or seed")
+        failures = _regressions(results, reference["results"], tolerance)
+        for failure in failures:
+            print(f"regression {failure}")
+        if failures:
+            sys.exit(1)
+        print("no regressions against the baseline")
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -0,0 +1,69 @@
+"""
+Steps per second of the in-process and the multiprocess vector environments.
+
+Both vector environments are stepped with the same random actions on the csv
+map, steps/sec counts the steps of single environments, ie. one vector step
+of 8 environments counts as 8 steps.
+
+Run from the src folder:
+    python -m benchmarks.vecenv --num_envs=8 --steps=500
+"""
+from functools import partial
+import time
+from typing import Any, Callable, List, Optional
+import fire  # type: ignore
+import numpy as np
+from game.constants import PlayerAction
+from game.env import BombermanVectorEnv
+from game.rollout import SubprocessVectorEnv
+from game.utils.mapfile import read_map
+
+_MAP_FILE = 'maps/map_1.csv'
+
+
+def _steps_per_second(vector_env: Any, actions: np.ndarray, seed: int) -> float:
+    """environment steps per second, the reset is not timed"""
+    vector_env.reset(seed=seed)
+    start = time.perf_counter()
+    for step_actions in actions:
+        vector_env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    return actions.size / elapsed
+
+
+def run(num_envs: int = 8, steps: int = 500, seed: int = 0,
+        num_workers: Optional[int] = None):
+    """
+    Times the vector environments stepping with random actions.
+
+    Parameters
+    ----------
+    num_envs: int
+        number of environments of each vector environment
+    steps: int
+        number of vector steps timed
+    seed: int
+        seed for the environments and the actions
+    num_workers: Optional[int]
+        number of worker processes of `SubprocessVectorEnv`, defaults to the number of CPUs
+    """
+    layout = read_map(_MAP_FILE)
+    actions = np.random.default_rng(seed).integers(0, len(PlayerAction), (steps, num_envs))
+    # each one is created right before it is timed and closed right after
+    factories: List[Callable[[], Any]] = [
+        partial(BombermanVectorEnv, layout, num_envs),
+        partial(SubprocessVectorEnv, layout, num_envs, num_workers=num_workers),
+    ]
+
+    print(f"{'vector env':<24}{'envs':>6}{'steps/sec':>12}")
+    for factory in factories:
+        vector_env = factory()
+        try:
+            rate = _steps_per_second(vector_env, actions, seed)
+        finally:
+            vector_env.close()
+        print(f"{type(vector_env).__name__:<24}{num_envs:>6}{rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
@@ -1,5 +1,6 @@
 """Command Line Interface for running the game"""
 import os
+from typing import Optional
 from pathlib import Path
 import fire  # type: ignore
 
@@ -7,10 +8,23 @@ import fire  # type: ignore
 from game.menu import main_menu
 
 
-def run_the_game(level: int = 1):
-    """Main function to run the game"""
+def run_the_game(level: int = 1, profile: Optional[str] = None, dirty_rects: bool = False):
+    """
+    Main function to run the game
+
+    Parameters
+    ----------
+    level: int
+        initial level of the map
+    profile: Optional[str]
+        profile the frames, eg. --profile=frames writes frames.csv and frames.json on exit
+    dirty_rects: bool
+        present only the changed parts of the screen, eg. on software rendered displays
+    """
+    if profile is not None:
+        profile = str(Path(profile).resolve())
     os.chdir(Path(__file__).resolve().parent)
-    main_menu(level)
+    main_menu(level, profile, dirty_rects)
     # start_game(level)
 
 
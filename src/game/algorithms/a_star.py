@@ -1,7 +1,143 @@
 """File handles the implementation of A star algorithm."""
-from pathfinding.core.diagonal_movement import DiagonalMovement  # type: ignore
-from pathfinding.core.grid import Grid  # type: ignore
-from pathfinding.finder.a_star import AStarFinder  # type: ignore
+from heapq import heappop, heappush
+from typing import List, Sequence, Tuple
+import numpy as np
+from ..constants import MapCell
+from .grid import neighbour_table
+
+# (column, row) node of the grid
+Node = Tuple[int, int]
+
+
+class AStar:
+    # pylint: disable=too-many-instance-attributes
+    """
+    A star search on a 4-connected grid stored as a flat array.
+
+    The open set is a binary heap and the heuristic the Manhattan distance.
+    The neighbour table is shared by all grids of the same size. The cost,
+    parent and visited buffers are allocated once and reused by every search,
+    a generation counter tells entries of older searches apart instead of
+    clearing the buffers.
+
+    Parameters
+    ----------
+    walkable: Sequence[int]
+        row major cells of the grid, non zero where the cell can be walked on
+    columns: int
+        width of the grid
+    """
+
+    def __init__(self, walkable: Sequence[int], columns: int):
+        self.walkable = bytearray(1 if cell else 0 for cell in walkable)
+        self.columns = columns
+        self.rows = len(self.walkable) // columns
+        self._neighbours = neighbour_table(columns, self.rows)
+        size = len(self.walkable)
+        self._cost = [0] * size
+        self._parent = [0] * size
+        self._seen = [0] * size
+        self._closed = [0] * size
+        self._generation = 0
+
+    @classmethod
+    def from_map(cls, mapdata: list) -> "AStar":
+        """
+        Builds the grid of a map layout.
+
+        Parameters
+        ----------
+        mapdata: list
+            List of the mapdata
+        """
+        encoded_map = _encode_map(mapdata)
+        columns = max(len(row) for row in encoded_map)
+        walkable = []
+        for row in encoded_map:
+            walkable.extend(row + [0] * (columns - len(row)))
+        return cls(walkable, columns)
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray) -> "AStar":
+        """
+        Builds the grid of a compiled map.
+
+        Parameters
+        ----------
+        grid: np.ndarray
+            (rows, columns) grid of MapCell codes, see utils.mapfile
+        """
+        blocked = [cell.value for cell in (MapCell.WALL, MapCell.BORDER,
+                                           MapCell.ONE_EXPLOSION_WALL, MapCell.TWO_EXPLOSION_WALL)]
+        return cls(np.isin(grid, blocked, invert=True).ravel().tolist(), grid.shape[1])
+
+    def find_path(self, start: Node, goal: Node) -> List[Node]:
+        # pylint: disable=too-many-locals
+        """
+        Shortest path between two nodes.
+
+        Parameters
+        ----------
+        start: Tuple[int, int]
+            (column, row) node the path starts at
+        goal: Tuple[int, int]
+            (column, row) node the path ends at
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            nodes from start to goal, both included, empty when there is no path
+        """
+        columns, walkable = self.columns, self.walkable
+        if not (self._is_inside(start) and self._is_inside(goal)):
+            return []
+        start_index = start[1] * columns + start[0]
+        goal_index = goal[1] * columns + goal[0]
+        if not (walkable[start_index] and walkable[goal_index]):
+            return []
+
+        self._generation += 1
+        generation = self._generation
+        cost, parent, seen, closed = self._cost, self._parent, self._seen, self._closed
+        neighbours = self._neighbours
+        goal_column, goal_row = goal
+        cost[start_index] = 0
+        parent[start_index] = -1
+        seen[start_index] = generation
+        open_heap = [(abs(start[0] - goal_column) + abs(start[1] - goal_row), 0, start_index)]
+        while open_heap:
+            _, index_cost, index = heappop(open_heap)
+            if closed[index] == generation:
+                continue
+            if index == goal_index:
+                return self._reconstruct(index)
+            closed[index] = generation
+            for neighbour in neighbours[index]:
+                if not walkable[neighbour] or closed[neighbour] == generation:
+                    continue
+                neighbour_cost = index_cost + 1
+                if seen[neighbour] != generation or neighbour_cost < cost[neighbour]:
+                    seen[neighbour] = generation
+                    cost[neighbour] = neighbour_cost
+                    parent[neighbour] = index
+                    row_distance = abs(neighbour // columns - goal_row)
+                    column_distance = abs(neighbour % columns - goal_column)
+                    heappush(open_heap, (neighbour_cost + row_distance + column_distance,
+                                         neighbour_cost, neighbour))
+        return []
+
+    def _is_inside(self, node: Node) -> bool:
+        """checks if the node lies on the grid"""
+        return 0 <= node[0] < self.columns and 0 <= node[1] < self.rows
+
+    def _reconstruct(self, index: int) -> List[Node]:
+        """follows the parents from the goal back to the start"""
+        path = []
+        while index != -1:
+            path.append((index % self.columns, index // self.columns))
+            index = self._parent[index]
+        path.reverse()
+        return path
 
 
 def get_path(mapdata: list, player_node: tuple, enemy_node: tuple) -> list:
@@ -11,14 +147,7 @@ def get_path(mapdata: list, player_node: tuple, enemy_node: tuple) -> list:
     :param enemy_node: Enemy location
     :return: Possible path to enemy
     """
-    grid = Grid(matrix=_encode_map(mapdata))
-    finder = AStarFinder(diagonal_movement=DiagonalMovement.always)
-    player_node_x, player_node_y = player_node
-    enemy_node_x, enemy_node_y = enemy_node
-    player_on_grid = grid.node(player_node_x, player_node_y)
-    enemy_on_grid = grid.node(enemy_node_x, enemy_node_y)
-    path, _ = finder.find_path(player_on_grid, enemy_on_grid, grid)
-    return path
+    return AStar.from_map(mapdata).find_path(player_node, enemy_node)
 
 
 def _encode_map(mapdata: list) -> list:
@@ -0,0 +1,159 @@
+"""Flow field pathfinding towards a single target shared by all enemies."""
+from collections import deque
+from typing import List, Optional, Tuple
+from ..broadphase import Cell
+from ..walls import WallGroup
+from .grid import neighbour_table
+
+_UNREACHABLE = -1
+
+
+class FlowField:
+    # pylint: disable=too-many-instance-attributes
+    """
+    Breadth first search flow field from a target cell over the walkable cells.
+
+    One search from the target gives every reachable cell the neighbouring cell
+    to step on next, so any number of enemies read their next move in O(1).
+    The walkable grid is kept in step with the walls through the wall group
+    listeners and the field is only searched again when the target moved or a
+    wall was removed, and only when it is read.
+
+    Parameters
+    ----------
+    walls: WallGroup
+        walls of the level, every cell holding a wall is blocked
+    columns: int
+        width of the map in cells
+    rows: int
+        height of the map in cells
+    """
+
+    def __init__(self, walls: WallGroup, columns: int, rows: int):
+        self.walls = walls
+        self.columns = columns
+        self.rows = rows
+        self._neighbours = neighbour_table(columns, rows)
+        self._blocked = bytearray(columns * rows)
+        for wall in walls:
+            self._set_blocked(walls.cell_of(wall.rect.topleft))
+        self._next: List[int] = [_UNREACHABLE] * (columns * rows)
+        self._distance: List[int] = [_UNREACHABLE] * (columns * rows)
+        self.target: Optional[Cell] = None
+        self._stale = True
+        self.searches = 0
+        walls.add_listener(self._wall_changed)
+
+    def set_target(self, cell: Cell):
+        """
+        Moves the target of the field, the field is searched again on the next read.
+
+        Parameters
+        ----------
+        cell: Tuple[int, int]
+            (column, row) cell to lead towards
+        """
+        if cell != self.target:
+            self.target = cell
+            self._stale = True
+
+    def next_cell(self, cell: Cell) -> Optional[Cell]:
+        """
+        Neighbouring cell to step on to get closer to the target.
+
+        Parameters
+        ----------
+        cell: Tuple[int, int]
+            (column, row) cell to start from
+
+        Returns
+        -------
+        Optional[Tuple[int, int]]
+            None when the cell is the target, blocked or cannot reach the target
+        """
+        index = self._index(cell)
+        if index is None:
+            return None
+        self._search()
+        next_index = self._next[index]
+        if next_index == _UNREACHABLE:
+            return None
+        return next_index % self.columns, next_index // self.columns
+
+    def distance(self, cell: Cell) -> Optional[int]:
+        """
+        Number of steps from the cell to the target.
+
+        Parameters
+        ----------
+        cell: Tuple[int, int]
+            (column, row) cell to start from
+
+        Returns
+        -------
+        Optional[int]
+            None when the cell cannot reach the target
+        """
+        index = self._index(cell)
+        if index is None:
+            return None
+        self._search()
+        distance = self._distance[index]
+        return None if distance == _UNREACHABLE else distance
+
+    def is_walkable(self, cell: Cell) -> bool:
+        """
+        Check if no wall blocks the cell.
+
+        Parameters
+        ----------
+        cell: Tuple[int, int]
+            (column, row) cell to check
+        """
+        index = self._index(cell)
+        return index is not None and not self._blocked[index]
+
+    def _search(self):
+        """runs the breadth first search from the target if the field is stale"""
+        if not self._stale:
+            return
+        self._stale = False
+        size = self.columns * self.rows
+        self._next = [_UNREACHABLE] * size
+        self._distance = [_UNREACHABLE] * size
+        target = self._index(self.target) if self.target is not None else None
+        if target is None or self._blocked[target]:
+            return
+        self.searches += 1
+        neighbours, blocked = self._neighbours, self._blocked
+        next_cells, distances = self._next, self._distance
+        distances[target] = 0
+        queue = deque([target])
+        while queue:
+            index = queue.popleft()
+            for neighbour in neighbours[index]:
+                if distances[neighbour] == _UNREACHABLE and not blocked[neighbour]:
+                    distances[neighbour] = distances[index] + 1
+                    next_cells[neighbour] = index
+                    queue.append(neighbour)
+
+    def _wall_changed(self, cell: Cell):
+        """unblocks the cell of a removed wall, or blocks it again when a wall was added"""
+        index = self._index(cell)
+        blocked = 1 if self.walls.spatial_hash.at_cell(cell) else 0
+        if index is not None and self._blocked[index] != blocked:
+            self._blocked[index] = blocked
+            self._stale = True
+
+    def _set_blocked(self, cell: Cell):
+        """marks the cell as blocked"""
+        index = self._index(cell)
+        if index is not None:
+            self._blocked[index] = 1
+
+    def _index(self, cell: Tuple[int, int]) -> Optional[int]:
+        """index of the cell in the flat grids, None outside of the map"""
+        column, row = cell
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row * self.columns + column
+        return None
@@ -0,0 +1,34 @@
+"""Helpers for grids stored as flat, row major arrays."""
+from functools import lru_cache
+from typing import List, Tuple
+
+
+@lru_cache(maxsize=8)
+def neighbour_table(columns: int, rows: int) -> List[Tuple[int, ...]]:
+    """
+    Indices of the 4-connected neighbours of every cell of a flat grid.
+
+    The table only depends on the size of the grid, so it is shared by all
+    searches on grids of that size.
+
+    Parameters
+    ----------
+    columns: int
+        width of the grid
+    rows: int
+        height of the grid
+    """
+    table = []
+    for index in range(columns * rows):
+        row, column = divmod(index, columns)
+        neighbours = []
+        if row > 0:
+            neighbours.append(index - columns)
+        if row < rows - 1:
+            neighbours.append(index + columns)
+        if column > 0:
+            neighbours.append(index - 1)
+        if column < columns - 1:
+            neighbours.append(index + 1)
+        table.append(tuple(neighbours))
+    return table
@@ -1,12 +1,13 @@
 """Setting up the bomb item used by bomberman"""
 
-from typing import List
+from typing import List, Tuple
 import pygame
 from .utils.fileutils import import_from_spritesheet
 from .constants import BombItem, TileType
 from .settings import Game
-from . import explosion
-from . import level
+from .walls import WallGroup
+from .clock import TickClock
+from .utils.pool import Pool
 
 class Bomb(pygame.sprite.Sprite):
     """
@@ -14,15 +15,19 @@ class Bomb(pygame.sprite.Sprite):
     
     """
     # pylint: disable=too-many-instance-attributes
-    def __init__(self, position: List, bomb_range: int,
-                 walls: pygame.sprite.Group, display_surface: pygame.Surface):
+    def __init__(self, position: List, bomb_range: int, walls: WallGroup,
+                 level_bombs: pygame.sprite.Group, clock: TickClock):
         """ 
         Parameters
         ----------
         position: Tuple
             initial position of the bomb on map
-        walls: pygame.sprite.Group
-            group representing all the wall sprites in level
+        walls: WallGroup
+            grid indexed group of all the wall sprites in level
+        level_bombs: pygame.sprite.Group
+            group collecting the bombs revealed by breaking a wall
+        clock: TickClock
+            simulation clock of the level timing the fuse
         """
         super().__init__()
 
@@ -32,15 +37,73 @@ class Bomb(pygame.sprite.Sprite):
         self.frame_index = 0
         self.image = self.animations[self.frame_index]
         self.rect = self.image.get_rect(topleft = position)
-        self.start_time = pygame.time.get_ticks()
+        self.clock = clock
+        self.start_time = clock.ticks
         self.range = bomb_range
         self.explosion_tiles_pos: List = []
-        self.explosions: List = []
         self.elapsed_time = 0
         self.has_bomb_exploded = False
         self.has_explosion_ended = False
         self.walls = walls
-        self.display_surface = display_surface
+        self.level_bombs = level_bombs
+        # group holding only this bomb, kept for the whole life of the sprite
+        self.single = pygame.sprite.GroupSingle(self)
+
+    def reset(self, position: List, bomb_range: int, walls: WallGroup,
+              level_bombs: pygame.sprite.Group, clock: TickClock):
+        """
+        re-arms a recycled bomb in place, see `BOMB_POOL`
+        ----------
+        Parameters
+        ----------
+        same as for creating a bomb
+        """
+        self.frame_index = 0
+        self.image = self.animations[self.frame_index]
+        self.rect.topleft = position
+        self.clock = clock
+        self.start_time = clock.ticks
+        self.range = bomb_range
+        self.explosion_tiles_pos.clear()
+        self.elapsed_time = 0
+        self.has_bomb_exploded = False
+        self.has_explosion_ended = False
+        self.walls = walls
+        self.level_bombs = level_bombs
+
+    def get_state(self) -> Tuple:
+        """
+        compact copy of the mutable state of the bomb, see `set_state`
+        """
+        return (self.rect.topleft, self.range, self.start_time, self.frame_index,
+                self.elapsed_time, self.has_bomb_exploded, self.has_explosion_ended,
+                tuple((position[0], position[1]) for position in self.explosion_tiles_pos))
+
+    def set_state(self, state: Tuple):
+        """
+        puts the bomb back into a state returned by `get_state`
+        ----------
+        Parameters
+        ----------
+        state: Tuple
+            state of the bomb
+        """
+        (self.rect.topleft, self.range, self.start_time, self.frame_index, self.elapsed_time,
+         self.has_bomb_exploded, self.has_explosion_ended, tiles) = state
+        self.image = self.animations[int(self.frame_index)]
+        self.explosion_tiles_pos[:] = [list(position) for position in tiles]
+
+    def release(self):
+        """
+        returns the bomb to its pool once it left the level, the bomb must not
+        be used afterwards
+        """
+        # a bomb waiting in the pool must not keep the level it left alive,
+        # `reset` hands it the walls, bombs and clock of its next level
+        self.walls = None  # type: ignore[assignment]
+        self.level_bombs = None  # type: ignore[assignment]
+        self.clock = None  # type: ignore[assignment]
+        BOMB_POOL.release(self)
 
     def build_bomb_animations(self):
         """
@@ -107,63 +170,51 @@ class Bomb(pygame.sprite.Sprite):
         explosion_pos: List
             coordinates of the bomb explosion
         """
-        for wall in self.walls:
-            if wall.rect.x == explosion_pos[0] and wall.rect.y == explosion_pos[1]:
-                if not wall.destroyable:
-                    return False
-                if wall.tile_type == TileType.TWO_EXPLOSION:
-                    wall.update_tile_type(TileType.TWO_EXPLOSION, TileType.ONE_EXPLOSION_BOMB)
-                elif wall.does_wall_contain_bomb:
-                    level.Level.level_bombs.add(
-                        Bomb(  [wall.rect.x, wall.rect.y],
-                                2,
-                                self.walls,
-                                self.display_surface
-                             ))
-                    self.walls.remove(wall)
-                else:
-                    self.walls.remove(wall)
-                return True
+        wall = self.walls.wall_at(explosion_pos)
+        if wall is None:
+            return True
+        if not wall.destroyable:
+            return False
+        if wall.tile_type == TileType.TWO_EXPLOSION:
+            wall.update_tile_type(TileType.TWO_EXPLOSION, TileType.ONE_EXPLOSION_BOMB)
+            self.walls.mark_changed(wall)
+        elif wall.does_wall_contain_bomb:
+            self.level_bombs.add(
+                BOMB_POOL.acquire(  [wall.rect.x, wall.rect.y],
+                                    2,
+                                    self.walls,
+                                    self.level_bombs,
+                                    self.clock
+                                 ))
+            self.walls.remove(wall)
+        else:
+            self.walls.remove(wall)
         return True
 
-    def render_and_update_explosions(self, level_shift: List):
-        """
-        render and update explosions caused by bombs placed in the level
-        ----------
-        Parameters
-        ----------
-        level_shift: List
-            amount the level has shifted in x and y direction
-        """
-        for expl in self.explosions:
-            expl.draw(self.display_surface)
-            expl.update(level_shift)
-
-    def update(self, level_shift: List):
+    def update(self, animate: bool = True):
         """
         updates bomb state
         ----------
         Parameters
         ----------
-        level_shift: List
-            amount the level has shifted in x and y direction
+        animate: bool
+            play the animation, skipped for bombs nobody sees
         """
-        self.animate()
-        self.rect.x += level_shift[0]
-        self.rect.y += level_shift[1]
+        if animate:
+            self.animate()
 
-        self.elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
+        self.elapsed_time = self.clock.seconds_since(self.start_time)
         if ( self.elapsed_time >= BombItem.EXPLOSION_TIME_DURATION.value and
              not self.has_bomb_exploded ):
             # bomb explodes here
             self.has_bomb_exploded = True
+            # the blast is drawn and collided by the explosion layer of the level
             self._get_bomb_explosion_tiles()
-            for _, exp_tile_pos in enumerate(self.explosion_tiles_pos):
-                a_explosion: pygame.sprite.GroupSingle = pygame.sprite.GroupSingle()
-                a_explosion.add(explosion.Explosion(exp_tile_pos))
-                self.explosions.append(a_explosion)
         if ( self.elapsed_time >= BombItem.EXPLOSION_END_TIME_DURATION.value and
              not self.has_explosion_ended ):
             # bomb explosion ends here
             self.has_explosion_ended = True
-        self.render_and_update_explosions(level_shift)
+
+
+# bombs are recycled once they left the level instead of being rebuilt for every deploy
+BOMB_POOL: Pool[Bomb] = Pool(Bomb, Bomb.reset)
@@ -0,0 +1,137 @@
+"""Uniform grid broadphase used to narrow down collision checks to nearby sprites."""
+from typing import Any, Dict, Iterable, List, Tuple
+import pygame
+from .settings import Game
+
+Cell = Tuple[int, int]
+
+
+class SpatialHash:
+    """
+    Buckets sprites by the grid cells their world space rect overlaps.
+
+    Parameters
+    ----------
+    cell_size: int
+        width and height of a single cell
+    """
+
+    def __init__(self, cell_size: int = Game.TILE_SIZE.value):
+        self.cell_size = cell_size
+        self._buckets: Dict[Cell, List[Any]] = {}
+        self._sprite_cells: Dict[Any, List[Cell]] = {}
+
+    def cells_overlapping(self, rect: pygame.Rect) -> List[Cell]:
+        """
+        Grid cells (column, row) overlapped by the given rect.
+
+        Parameters
+        ----------
+        rect: pygame.Rect
+            rect in world co-ordinates
+        """
+        left = rect.left // self.cell_size
+        right = (rect.right - 1) // self.cell_size
+        top = rect.top // self.cell_size
+        bottom = (rect.bottom - 1) // self.cell_size
+        return [(column, row) for row in range(top, bottom + 1)
+                for column in range(left, right + 1)]
+
+    def insert(self, sprite: Any):
+        """Buckets the sprite by its current rect."""
+        cells = self.cells_overlapping(sprite.rect)
+        self._sprite_cells[sprite] = cells
+        for cell in cells:
+            self._buckets.setdefault(cell, []).append(sprite)
+
+    def remove(self, sprite: Any):
+        """Removes the sprite from the buckets it was inserted into."""
+        for cell in self._sprite_cells.pop(sprite, []):
+            bucket = self._buckets[cell]
+            bucket.remove(sprite)
+            if not bucket:
+                del self._buckets[cell]
+
+    def clear(self):
+        """Removes every sprite."""
+        self._buckets.clear()
+        self._sprite_cells.clear()
+
+    def at_cell(self, cell: Cell) -> List[Any]:
+        """Sprites bucketed in a single cell."""
+        return self._buckets.get(cell, [])
+
+    def query(self, rect: pygame.Rect) -> List[Any]:
+        """
+        Candidate sprites in the cells overlapped by rect, without duplicates.
+
+        Parameters
+        ----------
+        rect: pygame.Rect
+            rect in world co-ordinates
+        """
+        candidates: Dict[Any, None] = {}
+        for cell in self.cells_overlapping(rect):
+            for sprite in self._buckets.get(cell, ()):
+                candidates[sprite] = None
+        return list(candidates)
+
+    def collide(self, rect: pygame.Rect) -> List[Any]:
+        """
+        Sprites whose rect collides with the given rect.
+
+        Parameters
+        ----------
+        rect: pygame.Rect
+            rect in world co-ordinates
+        """
+        return [sprite for sprite in self.query(rect)
+                if sprite.rect.colliderect(rect)]
+
+    def rebuild(self, sprites: Iterable[Any]):
+        """
+        Replaces the contents of the hash with the given sprites.
+
+        Parameters
+        ----------
+        sprites: Iterable
+            sprites to bucket by their current rect
+        """
+        self.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    Sprite group which keeps its sprites in a `SpatialHash`.
+
+    The hash is kept current through the group's add/remove hooks, so `remove`
+    and `Sprite.kill` keep it in sync. Sprites are expected to keep their world
+    position while they are part of the group.
+    """
+
+    def __init__(self, *sprites):
+        self.spatial_hash = SpatialHash()
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        """Adds the sprite to the group and buckets it by its grid cell."""
+        super().add_internal(sprite, layer)
+        self.spatial_hash.insert(sprite)
+
+    def remove_internal(self, sprite):
+        """Removes the sprite from the group and from its buckets."""
+        super().remove_internal(sprite)
+        self.spatial_hash.remove(sprite)
+
+    def collide(self, rect: pygame.Rect) -> List[Any]:
+        """
+        Sprites of the group whose rect collides with the given rect.
+
+        Parameters
+        ----------
+        rect: pygame.Rect
+            rect in world co-ordinates
+        """
+        return self.spatial_hash.collide(rect)
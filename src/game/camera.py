@@ -0,0 +1,136 @@
+"""Camera following the player through the level."""
+from typing import Any, Iterable, List, Tuple
+import pygame
+from .broadphase import SpatialGroup
+from .render import RenderQueue
+from .constants import Camera as CameraLimit, PlayerBomberman
+from .settings import GameWindow
+
+
+class Camera:
+    """
+    Owns the scroll offset of a level.
+
+    Sprites keep their world position at all times, the camera only decides which
+    part of the world is visible and applies its offset while rendering.
+
+    Parameters
+    ----------
+    width: int
+        width of the visible area in pixels
+    height: int
+        height of the visible area in pixels
+    """
+
+    def __init__(self, width: int = GameWindow.SCREEN_WIDTH.value,
+                 height: int = GameWindow.SCREEN_HEIGHT.value):
+        self.viewport = pygame.Rect(0, 0, width, height)
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """World position shown at the top left corner of the screen."""
+        return self.viewport.x, self.viewport.y
+
+    def follow(self, bomberman_player) -> Tuple[int, int]:
+        """
+        Scrolls the camera when the player walks towards the edge of the screen.
+
+        While scrolling the player keeps its position on screen: camera and player
+        move by the same amount through the world and the regular player movement
+        is paused.
+
+        Parameters
+        ----------
+        bomberman_player: player.Player
+            the player the camera follows
+
+        Returns
+        -------
+        Tuple[int, int]
+            amount the camera moved in x and y direction
+        """
+        player_x = bomberman_player.rect.centerx - self.viewport.x
+        direction_x = bomberman_player.direction.x
+        player_y = bomberman_player.rect.centery - self.viewport.y
+        direction_y = bomberman_player.direction.y
+        speed = PlayerBomberman.SPEED.value
+
+        if player_x < CameraLimit.CAMERA_X_LIMIT_LEFT.value and direction_x < 0:
+            #if player has reached left end of screen and wants to keep moving left
+            camera_shift = (-speed, 0)
+        elif player_x > CameraLimit.CAMERA_X_LIMIT_RIGHT.value and direction_x > 0:
+            #if player has reached right end of screen and wants to keep moving right
+            camera_shift = (speed, 0)
+        elif player_y < CameraLimit.CAMERA_Y_LIMIT_TOP.value and direction_y < 0:
+            #if player has reached top end of screen and wants to keep moving top
+            camera_shift = (0, -speed)
+        elif player_y > CameraLimit.CAMERA_Y_LIMIT_BOTTOM.value and direction_y > 0:
+            #if player has reached bottom end of screen and wants to keep moving down
+            camera_shift = (0, speed)
+        else:
+            #if the player is within limits of screen - no scroll needed
+            bomberman_player.speed = speed
+            return (0, 0)
+
+        bomberman_player.speed = 0
+        bomberman_player.rect.move_ip(camera_shift)
+        self.viewport.move_ip(camera_shift)
+        return camera_shift
+
+    def apply(self, rect: pygame.Rect) -> pygame.Rect:
+        """
+        Screen rect of a rect given in world co-ordinates.
+
+        Parameters
+        ----------
+        rect: pygame.Rect
+            rect in world co-ordinates
+        """
+        return rect.move(-self.viewport.x, -self.viewport.y)
+
+    def is_visible(self, rect: pygame.Rect) -> bool:
+        """
+        Check if a rect in world co-ordinates overlaps the visible area.
+
+        Parameters
+        ----------
+        rect: pygame.Rect
+            rect in world co-ordinates
+        """
+        return self.viewport.colliderect(rect)
+
+    def visible_sprites(self, sprites: Iterable) -> List[Any]:
+        """
+        Sprites overlapping the visible area.
+
+        Groups holding more sprites than there are cells in the viewport are looked
+        up through their spatial hash, so culling them costs in the screen size
+        rather than in the number of sprites.
+
+        Parameters
+        ----------
+        sprites: Iterable
+            sprites (or a sprite group) with world space rects
+        """
+        viewport = self.viewport
+        if isinstance(sprites, SpatialGroup):
+            cell_size = sprites.spatial_hash.cell_size
+            visible_cells = (viewport.width // cell_size + 2) * (viewport.height // cell_size + 2)
+            if len(sprites) > visible_cells:
+                return sprites.spatial_hash.collide(viewport)
+        return [sprite for sprite in sprites if viewport.colliderect(sprite.rect)]
+
+    def collect(self, queue: RenderQueue, sprites: Iterable):
+        """
+        Queues the visible sprites at their position relative to the camera.
+
+        Parameters
+        ----------
+        queue: RenderQueue
+            draw calls of the frame
+        sprites: Iterable
+            sprites (or a sprite group) with world space rects
+        """
+        offset_x, offset_y = self.viewport.x, self.viewport.y
+        queue.extend([(sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y))
+                      for sprite in self.visible_sprites(sprites)])
@@ -0,0 +1,83 @@
+"""Finding and lazily loading the maps of the levels."""
+from pathlib import Path
+import re
+from typing import List, Optional, Union
+import numpy as np
+from .utils.cache import LRUCache
+from .utils.mapfile import load_binary_map, read_map
+
+MAP_FOLDER = "maps"
+# file name of the map of a level, formatted with the level number, use
+# "map_{}.bmap" for compiled maps
+MAP_PATTERN = "map_{}.csv"
+
+
+class LevelCatalog:
+    """
+    Maps of the levels, found by their level number and read only when requested.
+
+    The file of a level follows from its number, so creating the catalog and
+    loading a level never lists the folder, no matter how many maps it holds.
+    Parsed layouts are kept in a least recently used cache. Compiled maps, files
+    ending in .bmap, are memory mapped instead of parsed, see utils.mapfile.
+
+    Parameters
+    ----------
+    folder: Union[str, Path]
+        folder holding the maps, relative paths are resolved on every load
+    pattern: str
+        file name of the map of a level, formatted with the level number
+    maxsize: Optional[int]
+        number of parsed layouts kept, None to keep all of them
+    """
+
+    def __init__(self, folder: Union[str, Path] = MAP_FOLDER, pattern: str = MAP_PATTERN,
+                 maxsize: Optional[int] = 16):
+        self.folder = Path(folder)
+        self.pattern = pattern
+        self._layouts: LRUCache[Union[List, np.ndarray]] = LRUCache(maxsize)
+
+    def path(self, level_number: int) -> Path:
+        """
+        File of the map of a level.
+
+        Parameters
+        ----------
+        level_number: int
+            Number of the level
+        """
+        return self.folder / self.pattern.format(level_number)
+
+    def load(self, level_number: int) -> Union[List, np.ndarray]:
+        """
+        Layout of a level, read from its file the first time it is requested.
+
+        Parameters
+        ----------
+        level_number: int
+            Number of the level
+
+        Returns
+        -------
+        Union[List, np.ndarray]
+            rows of map cells, or the read only grid of MapCell codes of a compiled
+            map, shared by every caller so it must not be changed
+        """
+        layout = self._layouts.get(level_number)
+        if layout is None:
+            path = self.path(level_number)
+            if not path.is_file():
+                raise KeyError(f"no map for level {level_number} at {path}")
+            layout = load_binary_map(path) if path.suffix == ".bmap" else read_map(path)
+            self._layouts.put(level_number, layout)
+        return layout
+
+    def level_numbers(self) -> List[int]:
+        """Numbers of all the levels with a map in the folder, in ascending order."""
+        prefix, _, suffix = self.pattern.partition("{}")
+        number = re.compile(f"{re.escape(prefix)}([0-9]+){re.escape(suffix)}")
+        matches = (number.fullmatch(path.name) for path in self.folder.iterdir())
+        return sorted(int(match.group(1)) for match in matches if match is not None)
+
+    def __contains__(self, level_number: int) -> bool:
+        return level_number in self._layouts or self.path(level_number).is_file()
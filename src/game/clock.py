@@ -0,0 +1,41 @@
+"""Tick based clock driving the game simulation."""
+from .settings import Game
+
+
+class TickClock:
+    """
+    Counts simulation ticks, every tick being one fixed timestep of 1/FPS seconds.
+
+    Game timers like the bomb fuse read this clock instead of the wall clock, so
+    a level behaves the same whether it is stepped in real time or as fast as
+    possible without a window.
+
+    Parameters
+    ----------
+    fps: int
+        number of ticks per simulated second
+    """
+
+    def __init__(self, fps: int = Game.FPS.value):
+        self.fps = fps
+        self.ticks = 0
+
+    def tick(self):
+        """Advances the clock by one timestep."""
+        self.ticks += 1
+
+    @property
+    def seconds(self) -> int:
+        """Whole simulated seconds since the clock started."""
+        return self.ticks // self.fps
+
+    def seconds_since(self, tick: int) -> int:
+        """
+        Whole simulated seconds elapsed since the given tick.
+
+        Parameters
+        ----------
+        tick: int
+            tick to measure from
+        """
+        return (self.ticks - tick) // self.fps
@@ -54,6 +54,12 @@ class ItemType(Enum):
     INVINCIBLE = 2
     EXTRA_TIME = 3
 
+class ItemEffect(Enum):
+    """
+    Constants of the timed item effects
+    """
+    DURATION = 15 #seconds the countdown of an effect starts from, it ends once 0 passed
+
 class BombItem(Enum):
     """
     Bomb item constants
@@ -72,3 +78,51 @@ class TileType(Enum):
     ONE_EXPLOSION_BOMB = 1
     TWO_EXPLOSION = 2
     ONE_EXPLOSION_NO_BOMB = 3
+
+class PlayerAction(Enum):
+    """
+    Discrete actions an agent can take, see env.BombermanEnv
+    """
+    NOOP = 0
+    LEFT = 1
+    RIGHT = 2
+    UP = 3
+    DOWN = 4
+    BOMB = 5
+
+class ObservationChannel(Enum):
+    """
+    Channels of the grid observation, wall channels match the TileType values
+    """
+    WALL = 0
+    WALL_ONE_EXPLOSION_BOMB = 1
+    WALL_TWO_EXPLOSION = 2
+    WALL_ONE_EXPLOSION_NO_BOMB = 3
+    PLAYER = 4
+    ENEMY = 5
+    BOMB = 6 #ticks left until the bomb explodes
+    EXPLOSION = 7
+    ITEM = 8
+
+class EnvReward(Enum):
+    """
+    Reward constants of the agent environment
+    """
+    STEP = -0.001
+    WALL_DESTROYED = 0.1
+    ITEM_COLLECTED = 0.2
+    ENEMY_KILLED = 1.0
+    GATEWAY_REACHED = 2.0
+    PLAYER_DIED = -1.0
+
+class MapCell(Enum):
+    """
+    Cell codes of compiled maps, see utils.mapfile
+    """
+    EMPTY = 0 #''
+    WALL = 1 #'W'
+    BORDER = 2 #'#'
+    ONE_EXPLOSION_WALL = 3 #'B_1'
+    TWO_EXPLOSION_WALL = 4 #'B_2'
+    ITEM = 5 #'I', an item hidden under a wall
+    PLAYER = 6 #'P'
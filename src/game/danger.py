@@ -0,0 +1,206 @@
+"""Precomputed blast times of the bombs in a level for fast safety queries."""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from .broadphase import Cell
+from .clock import TickClock
+from .constants import BombItem
+from .settings import Game
+from .walls import WallGroup
+
+# danger tick of cells no bomb reaches
+NEVER = np.iinfo(np.int64).max
+
+# range of the bombs revealed by breaking a wall, see bomb.Bomb
+_HIDDEN_BOMB_RANGE = 2
+
+# (cells, first tick) of a blast
+_Threat = Tuple[List[int], int]
+
+
+class DangerMap:
+    # pylint: disable=too-many-instance-attributes
+    """
+    Per cell tick at which the next known explosion reaches it.
+
+    Every bomb is turned into threats once, when it appears: the cells its blast
+    covers, replaying the rules of `bomb.Bomb`, and the tick it explodes. Walls
+    hiding a bomb inside the blast are followed as chain reactions until the
+    bomb explodes and the revealed bombs take over. Threats are dropped when
+    their bomb leaves the level after its explosion ended, so keeping the map up
+    to date costs time in the number of bombs and their range only.
+
+    `ticks` holds for every (row, column) the explosion tick of the earliest
+    threat reaching it, `NEVER` where no known bomb does, which makes safety
+    queries O(1).
+
+    Parameters
+    ----------
+    walls: WallGroup
+        walls of the level, unbreakable walls stop blasts
+    columns: int
+        width of the map in cells
+    rows: int
+        height of the map in cells
+    clock: TickClock
+        simulation clock timing the bomb fuses
+    """
+
+    def __init__(self, walls: WallGroup, columns: int, rows: int, clock: TickClock):
+        self.walls = walls
+        self.columns = columns
+        self.rows = rows
+        self.clock = clock
+        self.ticks = np.full((rows, columns), NEVER, dtype=np.int64)
+        self._flat_ticks = self.ticks.reshape(-1)
+        self._solid = bytearray(columns * rows)
+        for wall in walls:
+            index = self._index(*walls.cell_of(wall.rect.topleft))
+            if not wall.destroyable and index is not None:
+                self._solid[index] = 1
+        self._fuse_ticks = BombItem.EXPLOSION_TIME_DURATION.value * clock.fps
+        # bomb -> (chain reactions included, tick the bomb was placed, threats of the bomb)
+        self._bombs: Dict[object, Tuple[bool, int, List[_Threat]]] = {}
+        # cell index -> first tick of every threat covering the cell
+        self._cell_threats: Dict[int, Dict[int, int]] = {}
+
+    def update(self, bombs: Iterable):
+        """
+        Tracks the given bombs and forgets the ones no longer in the level.
+
+        Parameters
+        ----------
+        bombs: Iterable[bomb.Bomb]
+            all bombs currently in the level
+        """
+        current: Set[object] = set()
+        for bomb in bombs:
+            current.add(bomb)
+            tracked = self._bombs.get(bomb)
+            if tracked is None:
+                self._add(bomb)
+            elif tracked[1] != bomb.start_time or (tracked[0] and bomb.has_bomb_exploded):
+                # the bomb was recycled from the pool, or the bombs it revealed are
+                # in the level now and tracked by themselves
+                self._remove(bomb)
+                self._add(bomb)
+        for bomb in [bomb for bomb in self._bombs if bomb not in current]:
+            self._remove(bomb)
+
+    def clear(self):
+        """Forgets all tracked bombs, eg. before the bombs of a level are restored."""
+        self._bombs.clear()
+        self._cell_threats.clear()
+        self.ticks.fill(NEVER)
+
+    def ticks_until_explosion(self, cell: Cell) -> Optional[int]:
+        """
+        Ticks until an explosion reaches the cell, 0 while it is exploding.
+
+        Parameters
+        ----------
+        cell: Tuple[int, int]
+            (column, row) cell to check
+
+        Returns
+        -------
+        Optional[int]
+            None when no known bomb reaches the cell
+        """
+        index = self._index(*cell)
+        if index is None:
+            return None
+        tick = int(self._flat_ticks[index])
+        if tick == NEVER:
+            return None
+        return max(tick - self.clock.ticks, 0)
+
+    def is_safe(self, cell: Cell, ticks: int = 0) -> bool:
+        """
+        Check if no explosion reaches the cell within the given number of ticks.
+
+        Parameters
+        ----------
+        cell: Tuple[int, int]
+            (column, row) cell to check
+        ticks: int
+            number of ticks from now the cell has to stay safe
+        """
+        index = self._index(*cell)
+        return index is None or bool(self._flat_ticks[index] > self.clock.ticks + ticks)
+
+    def _add(self, bomb):
+        """registers the threats of a bomb and its chain reactions"""
+        with_chain = not bomb.has_bomb_exploded
+        column, row = self.walls.cell_of(bomb.rect.topleft)
+        threats = self._blast_threats(column, row, bomb.range, bomb.start_time, with_chain)
+        key = id(bomb)
+        for cells, first_tick in threats:
+            for index in cells:
+                starts = self._cell_threats.setdefault(index, {})
+                starts[key] = min(starts.get(key, NEVER), first_tick)
+                if first_tick < self._flat_ticks[index]:
+                    self._flat_ticks[index] = first_tick
+        self._bombs[bomb] = (with_chain, bomb.start_time, threats)
+
+    def _remove(self, bomb):
+        """drops the threats of a bomb and recomputes the cells they covered"""
+        _, _, threats = self._bombs.pop(bomb)
+        key = id(bomb)
+        for cells, _ in threats:
+            for index in cells:
+                starts = self._cell_threats.get(index)
+                if not starts or key not in starts:
+                    continue
+                del starts[key]
+                self._flat_ticks[index] = min(starts.values()) if starts else NEVER
+                if not starts:
+                    del self._cell_threats[index]
+
+    def _blast_threats(self, column: int, row: int, bomb_range: int, start_tick: int,
+                       with_chain: bool) -> List[_Threat]:
+        # pylint: disable=too-many-arguments
+        """threats of a bomb placed at the given tick and of the bombs it reveals"""
+        threats: List[_Threat] = []
+        pending = [(column, row, bomb_range, start_tick)]
+        revealed: Set[int] = set()
+        while pending:
+            column, row, bomb_range, start_tick = pending.pop()
+            cells = self._blast_cells(column, row, bomb_range)
+            explosion_tick = start_tick + self._fuse_ticks
+            threats.append((cells, explosion_tick))
+            if not with_chain:
+                break
+            for index in cells:
+                hidden_row, hidden_column = divmod(index, self.columns)
+                if index in revealed:
+                    continue
+                wall = self.walls.wall_at((hidden_column * Game.TILE_SIZE.value,
+                                           hidden_row * Game.TILE_SIZE.value))
+                if wall is not None and wall.does_wall_contain_bomb:
+                    revealed.add(index)
+                    pending.append((hidden_column, hidden_row, _HIDDEN_BOMB_RANGE,
+                                    explosion_tick))
+        return threats
+
+    def _blast_cells(self, column: int, row: int, bomb_range: int) -> List[int]:
+        """
+        cells of the map reached by a blast, like bomb.Bomb it only stops at
+        unbreakable walls, cells off the map are left out
+        """
+        center = self._index(column, row)
+        cells = [] if center is None else [center]
+        for column_step, row_step in ((-1, 0), (1, 0), (0, 1), (0, -1)):
+            for distance in range(1, bomb_range + 1):
+                index = self._index(column + column_step * distance, row + row_step * distance)
+                if index is None:
+                    continue
+                if self._solid[index]:
+                    break
+                cells.append(index)
+        return cells
+
+    def _index(self, column: int, row: int) -> Optional[int]:
+        """index of the cell in the flat grids, None outside of the map"""
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row * self.columns + column
+        return None
@@ -1,10 +1,12 @@
 """Setting up the Enemy character."""
 
 import math
+from typing import Optional
 import pygame
 from .utils.fileutils import import_from_spritesheet
 from .constants import EnemyStatus, EnemyBomberman
-# from .algorithms import a_star
+from .algorithms.flow_field import FlowField
+from .danger import DangerMap
 
 
 class Enemy(pygame.sprite.Sprite):
@@ -50,18 +52,9 @@ class Enemy(pygame.sprite.Sprite):
 
     def enemy_movement(self, path_to_player, h_ava, v_ava):
         """Adding directions specific positioning of the enemy."""
-        # _ = path_to_player  # To be removed
-        # if path_to_player:
-        #     x_direction, y_direction = path_to_player
-        #     x_current, y_current = self.current_location
-        #     y_difference = (y_direction - y_current)
-        #     if y_difference != 0:
-        #         self.rect.y += y_difference
-        #     else:
-        #         self.rect.x += (x_direction - x_current)
-        # else:
-        #     self.rect.x += self.direction
-        if self.timer > 75:
+        if path_to_player:
+            self.follow_path(path_to_player)
+        elif self.timer > 75:
             if h_ava:
                 self.rect.x += self.direction
                 self.prev_move = 0
@@ -90,6 +83,24 @@ class Enemy(pygame.sprite.Sprite):
                 self.rect.x += self.direction
                 self.prev_move = 0
 
+    def follow_path(self, next_location):
+        """Start moving towards the neighbouring map cell (column, row) on the path."""
+        x_next, y_next = next_location
+        x_current, y_current = self.current_location
+        if y_next != y_current:
+            self.direction = y_next - y_current
+            self.rect.y += self.direction
+            self.prev_move = 1
+        else:
+            self.direction = x_next - x_current
+            self.rect.x += self.direction
+            self.prev_move = 0
+
+    @staticmethod
+    def ticks_per_cell() -> int:
+        """Ticks the enemy needs to cross one map cell."""
+        return EnemyBomberman.SPRITE_WIDTH.value // EnemyBomberman.SPEED.value
+
     def enemy_collision(self):
         """Reverse the enemy once it collides with a wall"""
         self.direction *= -1
@@ -129,46 +140,70 @@ class Enemy(pygame.sprite.Sprite):
         """Change enemy color once it's come in contact with bomb."""
         self.image = self.animations[EnemyStatus.MOVE][0]
 
-    def update(self, level_shift, unavailable_move, acc_shift) -> None:
+    def get_state(self) -> tuple:
+        """Compact copy of the mutable state of the enemy, see `set_state`."""
+        return (self.rect.topleft, self.direction, tuple(self.current_location),
+                self.hit_by_bomb, self.life, self.pause, self.prev_move, self.timer,
+                self.image is self.animations[EnemyStatus.MOVE][0])
+
+    def set_state(self, state: tuple):
+        """
+        Puts the enemy back into a state returned by `get_state`.
+
+        Parameters
+        ----------
+        state [tuple] : state of the enemy
+        """
+        (self.rect.topleft, self.direction, current_location, self.hit_by_bomb, self.life,
+         self.pause, self.prev_move, self.timer, changed_color) = state
+        self.current_location = list(current_location)
+        self.image = self.animations[EnemyStatus.MOVE if changed_color else EnemyStatus.IDLE][0]
+
+    def update(self, unavailable_move, flow_field: Optional[FlowField] = None,
+               danger_map: Optional[DangerMap] = None) -> None:
         """
         Updating the status of the enemy on the map per frame.
 
         Parameters
         ----------
-        level_shift [Tuple] : The position of the enemy
+        unavailable_move [List] : Map cells (row, column) the enemy cannot move to
+        flow_field [Optional[FlowField]] : Leads the enemy towards the player when given
+        danger_map [Optional[DangerMap]] : Keeps the enemy from walking into explosions on its path
         """
         ava_list = []
         vertical_avail = False
         horizontal_avail = False
 
         self.timer = self.timer - 1
-        self.rect.x += level_shift[0]
-        self.rect.y += level_shift[1]
-
 
         self.current_location = self.get_location_on_map()
-        self.current_location[0] = self.current_location[0]+((-1)*math.ceil(acc_shift[0]/32))
 
         ava_list.append((self.current_location[1]+1,self.current_location[0]))
         ava_list.append((self.current_location[1]-1,self.current_location[0]))
         ava_list.append((self.current_location[1],self.current_location[0]+1))
         ava_list.append((self.current_location[1],self.current_location[0]-1))
 
-        if (((ava_list[0] not in unavailable_move) or (ava_list[1] not in unavailable_move)) and self.rect.x-acc_shift[0] == self.current_location[0]*32 and self.rect.y-acc_shift[1] == self.current_location[1]*32):
+        if (((ava_list[0] not in unavailable_move) or (ava_list[1] not in unavailable_move)) and self.rect.x == self.current_location[0]*32 and self.rect.y == self.current_location[1]*32):
             vertical_avail = True
-        if (((ava_list[2] not in unavailable_move) or (ava_list[3] not in unavailable_move)) and self.rect.x-acc_shift[0] == self.current_location[0]*32 and self.rect.y-acc_shift[1] == self.current_location[1]*32):
+        if (((ava_list[2] not in unavailable_move) or (ava_list[3] not in unavailable_move)) and self.rect.x == self.current_location[0]*32 and self.rect.y == self.current_location[1]*32):
             horizontal_avail = True
 
-        # path = a_star.get_path(mapdata, player_location, self.current_location)
         next_path = None
-        # if path:
-        #     *_, next_path, _ = path
+        wait_for_explosion = False
+        if (flow_field is not None and self.rect.x == self.current_location[0]*32 and
+                self.rect.y == self.current_location[1]*32):
+            next_path = flow_field.next_cell(tuple(self.current_location))
+            if (next_path is not None and danger_map is not None and
+                    danger_map.is_safe(tuple(self.current_location)) and
+                    not danger_map.is_safe(next_path, self.ticks_per_cell())):
+                # wait for the explosion on the path instead of walking into it
+                wait_for_explosion = True
         if self.pause:
             self.pause -= 1
         if self.hit_by_bomb and not self.pause:
             self.kill()
 
-        if self.pause == 0:
+        if self.pause == 0 and not wait_for_explosion:
             self.enemy_movement(next_path, horizontal_avail, vertical_avail)
         if (self.timer == 0):
             self.timer = 150
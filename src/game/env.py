@@ -0,0 +1,342 @@
+"""Gymnasium compatible environments for training agents on a level."""
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pygame
+from .constants import EnvReward, PlayerAction
+from .observation import ObservationEncoder, observation_shape
+from .settings import Game
+from .simulation import Simulation
+from .utils.mapfile import encode_layout
+
+try:
+    import gymnasium  # type: ignore # pylint: disable=import-error
+    from gymnasium import spaces  # type: ignore # pylint: disable=import-error
+except ImportError:
+    gymnasium = None  # type: ignore[assignment]
+
+# gymnasium is optional, without it the environment keeps the same API
+_EnvBase: Any = gymnasium.Env if gymnasium is not None else object
+
+_ACTION_KEYS = {
+    # pylint: disable=no-member
+    PlayerAction.NOOP.value: (),
+    PlayerAction.LEFT.value: (pygame.K_LEFT,),
+    PlayerAction.RIGHT.value: (pygame.K_RIGHT,),
+    PlayerAction.UP.value: (pygame.K_UP,),
+    PlayerAction.DOWN.value: (pygame.K_DOWN,),
+    PlayerAction.BOMB.value: (pygame.K_x,),
+}
+_DEFAULT_MAX_STEPS = 300 * Game.FPS.value
+
+
+class BombermanEnv(_EnvBase):
+    # pylint: disable=too-many-instance-attributes
+    """
+    Single player environment running a level headlessly.
+
+    Actions are `PlayerAction` values injected instead of keyboard input,
+    observations are the `np.uint8` grids of `observation.ObservationEncoder`.
+    The episode terminates when the player dies or reaches the gateway and is
+    truncated after `max_steps` agent steps.
+
+    Parameters
+    ----------
+    level_data: Union[List, np.ndarray]
+        The Map layout for the level, or the grid of a compiled map
+    level_number: int
+        Number of the level
+    max_steps: int
+        agent steps before the episode is truncated
+    frame_skip: int
+        level timesteps simulated per agent step with the same action
+    render_mode: Optional[str]
+        "rgb_array" to allow rendering the level into an array
+    """
+
+    metadata = {"render_modes": ["rgb_array"], "render_fps": Game.FPS.value}
+
+    def __init__(self, level_data: Union[List, np.ndarray], level_number: int = 1,
+                 max_steps: int = _DEFAULT_MAX_STEPS, frame_skip: int = 1,
+                 render_mode: Optional[str] = None):
+        # pylint: disable=too-many-arguments
+        # encoded once, so the levels built on every reset skip parsing the layout
+        self.level_data = (level_data if isinstance(level_data, np.ndarray)
+                           else encode_layout(level_data))
+        self.level_number = level_number
+        self.max_steps = max_steps
+        self.frame_skip = frame_skip
+        self.render_mode = render_mode
+        self.simulation = Simulation(self.level_data, level_number, seed=0)
+        self.encoder = ObservationEncoder(self.simulation.level)
+        self.observation_shape = observation_shape(self.level_data)
+        self._seed_rng = random.Random()
+        # seed and initial snapshot of the level built last, see `reset`
+        self._level_seed: Optional[int] = None
+        self._initial_state: Optional[Dict[str, Any]] = None
+        self._steps = 0
+        self._counts = (0, 0, 0)
+        self._canvas: Optional[pygame.Surface] = None
+        if gymnasium is not None:
+            self.action_space = spaces.Discrete(len(PlayerAction))
+            self.observation_space = spaces.Box(0, 255, self.observation_shape, np.uint8)
+
+    def reset(self, *, seed: Optional[int] = None,
+              options: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
+        # pylint: disable=unused-argument
+        """
+        Starts a new episode on the level of a seed drawn for it.
+
+        The seed decides where items, enemies and the gateway are placed, so a new
+        seed needs a freshly built level. When the drawn seed is the one of the
+        current level, eg. on every `reset(seed=s)` with the same s, the level is
+        put back into its initial snapshot instead, which is much cheaper.
+
+        Parameters
+        ----------
+        seed: Optional[int]
+            seed of this and all following episodes
+        options: Optional[Dict]
+            unused, part of the gymnasium API
+        """
+        if gymnasium is not None:
+            super().reset(seed=seed)  # pylint: disable=no-member
+        if seed is not None:
+            self._seed_rng.seed(seed)
+        level_seed = self._seed_rng.getrandbits(32)
+        if level_seed == self._level_seed and self._initial_state is not None:
+            self.simulation.level.restore(self._initial_state)
+        else:
+            self.simulation.level.release_bombs()
+            self.simulation = Simulation(self.level_data, self.level_number, seed=level_seed)
+            self.encoder = ObservationEncoder(self.simulation.level)
+            if self._canvas is not None:
+                self._attach_canvas()
+            self._level_seed = level_seed
+            self._initial_state = self.simulation.level.snapshot()
+        self._steps = 0
+        self._counts = self._entity_counts()
+        return self.observe(), self._info()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        """
+        Applies the action for `frame_skip` timesteps.
+
+        Parameters
+        ----------
+        action: int
+            a `PlayerAction` value
+
+        Returns
+        -------
+        Tuple[np.ndarray, float, bool, bool, Dict]
+            observation, reward, terminated, truncated and info
+        """
+        reward, terminated, truncated = self.advance(action)
+        return self.observe(), reward, terminated, truncated, self._info()
+
+    def advance(self, action: int) -> Tuple[float, bool, bool]:
+        """
+        Applies the action like `step` without building the observation.
+
+        Parameters
+        ----------
+        action: int
+            a `PlayerAction` value
+
+        Returns
+        -------
+        Tuple[float, bool, bool]
+            reward, terminated and truncated
+        """
+        keys = _ACTION_KEYS[int(action)]
+        for _ in range(self.frame_skip):
+            self.simulation.step(keys)
+            if self.simulation.is_over:
+                break
+        self._steps += 1
+        level_map = self.simulation.level
+
+        walls, items, enemies = self._entity_counts()
+        reward = EnvReward.STEP.value
+        reward += (self._counts[0] - walls) * EnvReward.WALL_DESTROYED.value
+        reward += (self._counts[1] - items) * EnvReward.ITEM_COLLECTED.value
+        reward += (self._counts[2] - enemies) * EnvReward.ENEMY_KILLED.value
+        self._counts = (walls, items, enemies)
+        player_died = level_map.player_hit_enemy or level_map.player_hit_explosion
+        if player_died:
+            reward += EnvReward.PLAYER_DIED.value
+        elif level_map.player_hit_gateway:
+            reward += EnvReward.GATEWAY_REACHED.value
+
+        terminated = self.simulation.is_over
+        truncated = not terminated and self._steps >= self.max_steps
+        return reward, terminated, truncated
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Captures the state of the episode, eg. to branch a tree search from it.
+
+        Returns
+        -------
+        Dict[str, Any]
+            the `level.Level.snapshot` along with the step count of the episode
+        """
+        return {"level": self.simulation.level.snapshot(), "steps": self._steps,
+                "counts": self._counts}
+
+    def restore(self, state: Dict[str, Any]):
+        """
+        Puts the episode back into a state returned by `snapshot`, without
+        building the level again.
+
+        Parameters
+        ----------
+        state: Dict[str, Any]
+            snapshot taken from this environment since its last reset
+        """
+        self.simulation.level.restore(state["level"])
+        self._steps = state["steps"]
+        self._counts = state["counts"]
+
+    def observe(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Observation of the current state.
+
+        Parameters
+        ----------
+        out: Optional[np.ndarray]
+            array to copy the observation into, a new one is returned when not given
+        """
+        grid = self.encoder.update()
+        if out is None:
+            return grid.copy()
+        np.copyto(out, grid)
+        return out
+
+    def render(self) -> Optional[np.ndarray]:
+        """Renders the whole level into an RGB array when render_mode is "rgb_array"."""
+        if self.render_mode != "rgb_array":
+            return None
+        if self._canvas is None:
+            self._canvas = pygame.Surface(self.simulation.level.map_size)
+            self._attach_canvas()
+        self._canvas.fill((128, 128, 128))
+        level_map = self.simulation.level
+        # the camera keeps scrolling with the player, the canvas always shows the whole map
+        viewport = level_map.camera.viewport
+        scrolled = viewport.topleft
+        viewport.topleft = (0, 0)
+        level_map.draw()
+        viewport.topleft = scrolled
+        return np.transpose(pygame.surfarray.array3d(self._canvas), (1, 0, 2))
+
+    def close(self):
+        """Releases the render canvas."""
+        self._canvas = None
+
+    def _attach_canvas(self):
+        """lets the level draw the whole map onto the render canvas"""
+        level_map = self.simulation.level
+        level_map.display_surface = self._canvas
+        level_map.camera.viewport.size = level_map.map_size
+
+    def _entity_counts(self) -> Tuple[int, int, int]:
+        """number of walls, items and enemies left"""
+        level_map = self.simulation.level
+        return len(level_map.walls), len(level_map.items), level_map.get_enemy_count()
+
+    def _info(self) -> Dict:
+        """extra information about the current state"""
+        level_map = self.simulation.level
+        player_location = level_map.get_player_location_on_map()
+        return {"ticks": self.simulation.ticks,
+                "enemies_alive": level_map.get_enemy_count(),
+                "player_location": player_location,
+                "ticks_until_explosion": level_map.danger_map.ticks_until_explosion(
+                    player_location)}
+
+
+class BombermanVectorEnv:
+    # pylint: disable=too-many-instance-attributes
+    """
+    Steps several `BombermanEnv` instances in lockstep.
+
+    Observations of all environments are written into one preallocated array of
+    shape (num_envs, channels, rows, columns). Environments whose episode ended
+    are reset within the same step, their last observation is passed on in
+    `infos["final_observation"]`.
+
+    Parameters
+    ----------
+    level_data: List
+        The Map layout used by all environments
+    num_envs: int
+        number of environments
+    kwargs:
+        passed on to every `BombermanEnv`
+    """
+
+    def __init__(self, level_data: List, num_envs: int, **kwargs):
+        self.envs = [BombermanEnv(level_data, **kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.observations = np.zeros((num_envs,) + self.envs[0].observation_shape,
+                                     dtype=np.uint8)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        if gymnasium is not None:
+            self.single_action_space = self.envs[0].action_space
+            self.single_observation_space = self.envs[0].observation_space
+            self.action_space = spaces.MultiDiscrete([len(PlayerAction)] * num_envs)
+            self.observation_space = spaces.Box(0, 255, self.observations.shape, np.uint8)
+
+    def reset(self, *, seed: Optional[int] = None,
+              options: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Resets all environments, environment i is seeded with seed + i.
+
+        Parameters
+        ----------
+        seed: Optional[int]
+            base seed of the environments
+        options: Optional[Dict]
+            passed on to every environment
+        """
+        for index, env in enumerate(self.envs):
+            env.reset(seed=None if seed is None else seed + index, options=options)
+            env.observe(self.observations[index])
+        return self.observations, {}
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                    np.ndarray, Dict]:
+        """
+        Steps every environment with its action.
+
+        Parameters
+        ----------
+        actions: Sequence[int]
+            one `PlayerAction` value per environment
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]
+            observations, rewards, terminated, truncated and infos
+        """
+        final_observations: List[Optional[np.ndarray]] = [None] * self.num_envs
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            reward, terminated, truncated = env.advance(action)
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            if terminated or truncated:
+                final_observations[index] = env.observe()
+                env.reset()
+            env.observe(self.observations[index])
+        return (self.observations, self.rewards, self.terminated, self.truncated,
+                {"final_observation": final_observations})
+
+    def close(self):
+        """Closes all environments."""
+        for env in self.envs:
+            env.close()
@@ -1,30 +1,146 @@
 """Setting up the bomb explosions"""
 
-from typing import Tuple
+from typing import Any, Dict, Iterable, List, Tuple
+import numpy as np
 import pygame
+from .broadphase import Cell
+from .render import RenderQueue
+from .settings import Game
 from .utils.fileutils import import_sprite
 
-class Explosion(pygame.sprite.Sprite):
+EXPLOSION_SPRITE = "graphics/explosion.png"
+
+
+class ExplosionLayer:
     """
-    Encapsulates the explosion at each individual tile caused by a bomb
-    
+    All the explosion tiles of a level, batched in one layer instead of a sprite per tile
+
+    The layer is synced with the bombs of the level once per step. Only bombs
+    exploding, recycled or leaving the level change it, the blast tiles are then
+    stored as one array of top left positions which is queued for drawing as
+    one batch per owner. Collision checks look up the cells a rect
+    overlaps in a per cell count of the blasts, blast tiles are grid aligned
+    so this gives the same result as testing the rects of the tiles.
+
+    Parameters
+    ----------
+    cell_size: int
+        width and height of a blast tile
     """
-    # pylint: disable=too-few-public-methods
-    def __init__(self, position: Tuple):
-        """ 
+
+    def __init__(self, cell_size: int = Game.TILE_SIZE.value):
+        self.cell_size = cell_size
+        # top left corner of every blast tile, in the order the bombs exploded
+        self.tiles = np.empty((0, 2), dtype=np.int64)
+        # True for the tiles of bombs placed by the player
+        self.from_player = np.empty(0, dtype=bool)
+        # exploded bomb -> (tick the bomb was placed, placed by the player, blast tiles)
+        self._bombs: Dict[Any, Tuple[int, bool, List[Tuple[int, int]]]] = {}
+        # cell -> [blasts of player bombs, blasts of level bombs] covering it
+        self._counts: Dict[Cell, List[int]] = {}
+
+    def update(self, player_bombs: Iterable, level_bombs: Iterable):
+        """
+        Adds the blasts of the bombs which exploded and drops the bombs gone from the level
+
+        Parameters
+        ----------
+        player_bombs: Iterable[bomb.Bomb]
+            bombs placed by the player
+        level_bombs: Iterable[bomb.Bomb]
+            bombs revealed by breaking a wall
+        """
+        exploded: Dict[Any, bool] = {}
+        for owner, bombs in ((True, player_bombs), (False, level_bombs)):
+            for bomb in bombs:
+                if bomb.has_bomb_exploded:
+                    exploded[bomb] = owner
+        changed = False
+        for bomb in [bomb for bomb, (start_time, _, _) in self._bombs.items()
+                     if exploded.get(bomb) is None or bomb.start_time != start_time]:
+            # gone from the level, or recycled from the pool since it exploded
+            _, owner, tiles = self._bombs.pop(bomb)
+            self._count(tiles, owner, -1)
+            changed = True
+        for bomb, owner in exploded.items():
+            if bomb not in self._bombs:
+                tiles = [(position[0], position[1]) for position in bomb.explosion_tiles_pos]
+                self._bombs[bomb] = (bomb.start_time, owner, tiles)
+                self._count(tiles, owner, 1)
+                changed = True
+        if changed:
+            self._rebuild()
+
+    def clear(self):
+        """drops all blasts, eg. before the bombs of a level are restored"""
+        self._bombs.clear()
+        self._counts.clear()
+        self._rebuild()
+
+    def collide(self, rect: pygame.Rect, level_bombs: bool = True) -> bool:
+        """
+        Check if a rect overlaps an explosion.
+
         Parameters
         ----------
-        position: Tuple
-            initial position of the bomb on map
+        rect: pygame.Rect
+            rect in world co-ordinates
+        level_bombs: bool
+            also check the blasts of the bombs revealed by breaking a wall
         """
-        super().__init__()
+        if not self._counts:
+            return False
+        owners = 2 if level_bombs else 1
+        size = self.cell_size
+        for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for column in range(rect.left // size, (rect.right - 1) // size + 1):
+                counts = self._counts.get((column, row))
+                if counts is not None and any(counts[:owners]):
+                    return True
+        return False
 
-        self.image = import_sprite("graphics/explosion.png")
-        self.rect = self.image.get_rect(topleft = position)
+    def cells(self) -> Iterable[Cell]:
+        """(column, row) cell of every blast tile, once per bomb reaching it"""
+        for left, top in (self.tiles // self.cell_size).tolist():
+            yield left, top
 
-    def update(self, level_shift):
+    def collect(self, queue: RenderQueue, viewport: pygame.Rect, from_player: bool):
         """
-        updates explosion state
+        Queues the visible blast tiles of the player's or the level's bombs.
+
+        Parameters
+        ----------
+        queue: RenderQueue
+            draw calls of the frame
+        viewport: pygame.Rect
+            visible part of the level in world co-ordinates
+        from_player: bool
+            draw the blasts of the player's bombs, otherwise the ones of the level bombs
         """
-        self.rect.x += level_shift[0]
-        self.rect.y += level_shift[1]
+        tiles = self.tiles[self.from_player == from_player]
+        if tiles.size == 0:
+            return
+        size = self.cell_size
+        visible = ((tiles[:, 0] + size > viewport.left) & (tiles[:, 0] < viewport.right) &
+                   (tiles[:, 1] + size > viewport.top) & (tiles[:, 1] < viewport.bottom))
+        image = import_sprite(EXPLOSION_SPRITE)
+        positions = (tiles[visible] - (viewport.x, viewport.y)).tolist()
+        queue.extend([(image, (left, top)) for left, top in positions])
+
+    def _count(self, tiles: List[Tuple[int, int]], owner: bool, step: int):
+        """adds step to the counts of the cells covered by the blast tiles"""
+        size = self.cell_size
+        slot = 0 if owner else 1
+        for left, top in tiles:
+            cell = (left // size, top // size)
+            counts = self._counts.setdefault(cell, [0, 0])
+            counts[slot] += step
+            if not any(counts):
+                del self._counts[cell]
+
+    def _rebuild(self):
+        """packs the tiles of the tracked bombs into the arrays"""
+        self.tiles = np.array([tile for _, _, tiles in self._bombs.values() for tile in tiles],
+                              dtype=np.int64).reshape(-1, 2)
+        self.from_player = np.array([owner for _, owner, tiles in self._bombs.values()
+                                     for _ in tiles], dtype=bool)
@@ -17,11 +17,3 @@ class Gateway(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         self.image = import_sprite("graphics/blackhole_1.png")
         self.rect = self.image.get_rect(topleft=position)
-
-    def update(self, level_shift: Tuple):
-        """
-        Update the locations of door according to the camera movement
-        """
-
-        self.rect.x += level_shift[0]
-        self.rect.y += level_shift[1]
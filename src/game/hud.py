@@ -0,0 +1,116 @@
+"""Heads up display of the game, with the rendered texts cached."""
+from typing import Dict, Hashable, Optional, Tuple
+import pygame
+from .render import RenderQueue
+from .utils.cache import LRUCache
+
+Color = Tuple[int, int, int]
+
+
+class TextCache:
+    # pylint: disable=too-few-public-methods
+    """
+    Rendered texts of a font, keyed by text and color.
+
+    Rasterizing text is among the most expensive calls of a frame, so every text
+    is rendered once and reused until it is evicted as least recently used.
+
+    Parameters
+    ----------
+    font: pygame.font.Font
+        font the texts are rendered with
+    maxsize: Optional[int]
+        number of rendered texts kept, None to keep all of them
+    """
+
+    def __init__(self, font: pygame.font.Font, maxsize: Optional[int] = 64):
+        self.font = font
+        self._surfaces: LRUCache[pygame.Surface] = LRUCache(maxsize)
+
+    def render(self, text: str, color: Color) -> pygame.Surface:
+        """
+        Antialiased image of the text.
+
+        Parameters
+        ----------
+        text: str
+            text to render
+        color: Tuple[int, int, int]
+            RGB color of the text
+        """
+        surface = self._surfaces.get((text, color))
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self._surfaces.put((text, color), surface)
+        return surface
+
+
+class Hud:
+    """
+    Texts shown at fixed positions of the screen, like the remaining time.
+
+    The texts are queued before the level, like the game always drew them, so
+    sprites passing the top of the screen are drawn over them.
+
+    Every text sits in a named slot. Setting a slot to the text it already shows
+    costs a comparison only, a changed text is taken from the `TextCache`.
+
+    Parameters
+    ----------
+    font: pygame.font.Font
+        font of the texts
+    maxsize: Optional[int]
+        number of rendered texts kept in the cache
+    """
+
+    def __init__(self, font: pygame.font.Font, maxsize: Optional[int] = 64):
+        self.texts = TextCache(font, maxsize)
+        # slot -> (text, color, rendered text, top left corner on the screen)
+        self._slots: Dict[Hashable, Tuple[str, Color, pygame.Surface, Tuple[int, int]]] = {}
+
+    def set_text(self, slot: Hashable, text: str, color: Color, position: Tuple[int, int]):
+        """
+        Shows a text in a slot, replacing the text shown there before.
+
+        Parameters
+        ----------
+        slot: Hashable
+            name of the slot
+        text: str
+            text to show, an empty text clears the slot
+        color: Tuple[int, int, int]
+            RGB color of the text
+        position: Tuple[int, int]
+            top left corner of the text on the screen
+        """
+        if not text:
+            self._slots.pop(slot, None)
+            return
+        current = self._slots.get(slot)
+        if current is not None and current[0] == text and current[1] == color:
+            if current[3] != position:
+                self._slots[slot] = (text, color, current[2], position)
+            return
+        self._slots[slot] = (text, color, self.texts.render(text, color), position)
+
+    def clear(self, slot: Hashable):
+        """
+        Hides the text of a slot.
+
+        Parameters
+        ----------
+        slot: Hashable
+            name of the slot
+        """
+        self._slots.pop(slot, None)
+
+    def collect(self, queue: RenderQueue):
+        """
+        Queues the texts of all slots, below everything queued after them.
+
+        Parameters
+        ----------
+        queue: RenderQueue
+            draw calls of the frame
+        """
+        queue.extend([(surface, position) for _, _, surface, position in self._slots.values()])
@@ -29,10 +29,3 @@ class Item(pygame.sprite.Sprite):
             self.image = import_sprite("graphics/extra_time.png")
             self.item_num = ItemType.EXTRA_TIME.value
         self.rect = self.image.get_rect(topleft=position)
-
-    def update(self, level_shift: Tuple):
-        """
-        Update the locations of items according to the camera movement
-        """
-        self.rect.x += level_shift[0]
-        self.rect.y += level_shift[1]
@@ -1,151 +1,196 @@
 """Setting up the players,obstacles and enemies in different maps."""
-from typing import List
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
 import random
+import numpy as np
 import pygame
 from . import tile
 from . import player
 from . import enemy
 from . import item
 from . import gateway
+from . import camera
+from .bomb import BOMB_POOL
+from .broadphase import SpatialGroup
+from .walls import WallGroup, WallLayer
+from .algorithms.flow_field import FlowField
+from .danger import DangerMap
+from .explosion import ExplosionLayer
+from .profiler import FrameProfiler
+from .render import RenderQueue
+from .clock import TickClock
+from .timers import EffectTimers
 from .settings import Game
-from .constants import Camera, PlayerBomberman, ItemType, TileType
+from .constants import ItemEffect, ItemType, MapCell, TileType
+from .utils.mapfile import encode_layout
+
+# destroyable and tile type of the walls built for a MapCell code
+_WALL_CELLS = {
+    MapCell.WALL.value: (False, TileType.NONE),
+    MapCell.BORDER.value: (False, TileType.NONE),
+    MapCell.ONE_EXPLOSION_WALL.value: (True, TileType.ONE_EXPLOSION_BOMB),
+    MapCell.TWO_EXPLOSION_WALL.value: (True, TileType.TWO_EXPLOSION),
+    MapCell.ITEM.value: (True, TileType.ONE_EXPLOSION_NO_BOMB),
+}
+
 
 class Level:
     # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-public-methods
     """
     Storing and graphically setting up the map for each level.
 
     """
 
-    player_hit_skate = False
-    player_hit_bomb_length = False
-    level_bombs: pygame.sprite.Group = pygame.sprite.Group()
-
-    def __init__(self, level_data: List, surface: pygame.Surface, level_number: int):
+    def __init__(self, level_data: Union[List, np.ndarray], surface: Optional[pygame.Surface],
+                 level_number: int,
+                 *, seed: Optional[int] = None, controls: Optional[Callable] = None,
+                 smart_enemies: bool = False, enemy_count: int = 3):
+        # pylint: disable=too-many-arguments
         """
         Parameters
         ----------
-        level_data: List
-            The Map layout for a level
+        level_data: Union[List, np.ndarray]
+            The Map layout for a level, or the grid of a compiled map
+        surface: Optional[pygame.Surface]
+            Surface the level is drawn on, None when the level only runs headless
+        level_number: int
+            Number of the level
+        seed: Optional[int]
+            Seed for the random item, hidden bomb and enemy placement
+        controls: Optional[Callable]
+            Replacement for `pygame.key.get_pressed` to script the player input
+        smart_enemies: bool
+            Let the enemies chase the player along the shortest path
+        enemy_count: int
+            Number of enemies placed in the lower right quarter of the map
         """
+        grid = level_data if isinstance(level_data, np.ndarray) else encode_layout(level_data)
         self.display_surface = surface
+        self.camera = camera.Camera()
+        self.clock = TickClock()
+        # running out of the item effects of the player, keyed by their ItemType
+        self.effects = EffectTimers(self.clock, self._effect_ended)
+        self.rng = random.Random(seed)
+        self.controls = controls if controls is not None else pygame.key.get_pressed
+        self.level_bombs: pygame.sprite.Group = pygame.sprite.Group()
         self.map_data = level_data
+        # MapCell codes of the layout, see utils.mapfile
+        self.grid = grid
         self.level_number = level_number
-        self.setup_level(level_data)
+        self.enemy_count = enemy_count
+        self.setup_level(grid)
+        rows, columns = grid.shape
+        self.map_size = (columns * Game.TILE_SIZE.value, rows * Game.TILE_SIZE.value)
+        self.smart_enemies = smart_enemies
+        self.pathfinder = FlowField(self.walls, columns, rows)
+        self.danger_map = DangerMap(self.walls, columns, rows, self.clock)
+        self.wall_layer: Optional[WallLayer] = None
+        # draw calls of the current frame, see `draw`
+        self.render_queue = RenderQueue()
+        # disabled until someone profiles the level, see maingame.start_game
+        self.profiler = FrameProfiler(enabled=False)
         self.player_hit_enemy = False
         self.player_hit_item = False
         self.player_hit_invincible = False
         self.player_hit_explosion = False
         self.player_hit_gateway = False
         self.gateway_flag = False
-        self.level_shift = (0,0)
-        self.shift_accumulated = [0,0]
         self.item_class = 0
 
-    def setup_level(self, layout: List):
-        # pylint: disable=too-many-branches
+    def setup_level(self, grid: np.ndarray):
+        # pylint: disable=too-many-locals
         """
         Setup up the map for a level.
 
         Parameters
         ----------
-        layout: List
-            The Map layout
+        grid: np.ndarray
+            The Map layout as (rows, columns) grid of MapCell codes
 
         """
-        self.walls: pygame.sprite.Group = pygame.sprite.Group()
+        self.walls = WallGroup()
         self.bomberman_player: pygame.sprite.GroupSingle = pygame.sprite.GroupSingle()
         self.bomberman_enemy: pygame.sprite.Group = pygame.sprite.Group()
-        self.items: pygame.sprite.Group = pygame.sprite.Group()
+        self.items = SpatialGroup()
+        self.explosion_layer = ExplosionLayer()
         self.gateway: pygame.sprite.GroupSingle = pygame.sprite.GroupSingle()
-        locations_for_enemy = self.get_locations_for_enemy(layout)
-        locations_for_gateway = self.get_locations_for_gateway(layout)
-        self.unavailable_locations = self.unavailable_locations_for_enemy(layout)
+        unavailable = self.unavailable_locations_for_enemy(grid)
+        locations_for_enemy = self.get_locations_for_enemy(unavailable)
+        locations_for_gateway = self.get_locations_for_gateway(unavailable)
+        self.unavailable_locations = set(map(tuple, np.argwhere(unavailable).tolist()))
+        tile_size = Game.TILE_SIZE.value
+
+        # walls are built in row major order, like the hidden bombs and items drawn from rng
+        cells = np.flatnonzero(np.isin(grid, list(_WALL_CELLS)))
+        walls = []
+        items = []
+        for cell, code in zip(cells.tolist(), grid.ravel()[cells].tolist()):
+            row_index, column_index = divmod(cell, grid.shape[1])
+            position = (column_index * tile_size, row_index * tile_size)
+            if code == MapCell.ITEM.value:
+                items.append(item.Item(position, self._random_item_type()))
+            destroyable, tile_type = _WALL_CELLS[code]
+            walls.append(tile.Tile(position, destroyable, tile_type, self.rng))
+        self.walls.add(*walls)
+        self.items.add(*items)
+        # everything which can leave the level, kept to bring it back on `restore`
+        self._breakable_walls = [wall for wall in walls if wall.destroyable]
+        self._all_items = items
+
+        players = np.argwhere(grid == MapCell.PLAYER.value).tolist()
+        if players:
+            # a single player, placed on the last player cell
+            row_index, column_index = players[-1]
+            self.bomberman_player.add(player.Player((column_index * tile_size,
+                                                     row_index * tile_size),
+                                                    self.walls,
+                                                    self.level_bombs,
+                                                    self.clock,
+                                                    self.controls))
+        self._all_enemies = [enemy.Enemy((column_index * tile_size, row_index * tile_size),
+                                         self.level_number)
+                             for row_index, column_index in sorted(set(locations_for_enemy))]
+        self.bomberman_enemy.add(*self._all_enemies)
         self.gateway_index = []
-        for row_index, row in enumerate(layout):
-            for column_index, column in enumerate(row):
-                y_position = row_index * Game.TILE_SIZE.value
-                x_position = column_index * Game.TILE_SIZE.value
-                if column in ('W', '#'):
-                    wall = tile.Tile((x_position, y_position), False, TileType.NONE)
-                    self.walls.add(wall)
-                #if column == 'B':
-                if column.startswith('B'):
-                    tile_type = column.split('_')[1]
-                    if tile_type == '1':
-                        wall = tile.Tile(
-                                            (x_position, y_position),
-                                            True,
-                                            TileType.ONE_EXPLOSION_BOMB
-                                         )
-                    elif tile_type == '2':
-                        wall = tile.Tile((x_position, y_position), True, TileType.TWO_EXPLOSION)
-                    self.walls.add(wall)
-                if column == 'I':
-                    prob = random.random()
-                    if prob < 0.25:
-                        powerup = item.Item((x_position, y_position), ItemType.SKATE.value)
-                    elif prob < 0.50:
-                        powerup = item.Item((x_position, y_position), ItemType.BOMB.value)
-                    elif prob < 0.75:
-                        powerup = item.Item((x_position, y_position), ItemType.INVINCIBLE.value)
-                    else:
-                        powerup = item.Item((x_position, y_position), ItemType.EXTRA_TIME.value)
-                    self.items.add(powerup)
-                    wall = tile.Tile((x_position, y_position), True, TileType.ONE_EXPLOSION_NO_BOMB)
-                    self.walls.add(wall)
-                if column == 'P':
-                    self.bomberman_player.add(player.Player(
-                                                                (x_position, y_position),
-                                                                self.walls,
-                                                                self.display_surface
-                                                            ))
-                if (row_index, column_index) in locations_for_enemy:
-                    self.bomberman_enemy.add(enemy.Enemy((x_position, y_position),
-                                                         self.level_number))
-                if (row_index, column_index) in locations_for_gateway:
-                    self.gateway_index.append(x_position)
-                    self.gateway_index.append(y_position)
+        for row_index, column_index in sorted(locations_for_gateway):
+            self.gateway_index.append(column_index * tile_size)
+            self.gateway_index.append(row_index * tile_size)
+
+    def _random_item_type(self) -> int:
+        """draws the power up hidden under an item wall"""
+        prob = self.rng.random()
+        if prob < 0.25:
+            return ItemType.SKATE.value
+        if prob < 0.50:
+            return ItemType.BOMB.value
+        if prob < 0.75:
+            return ItemType.INVINCIBLE.value
+        return ItemType.EXTRA_TIME.value
 
     def scroll(self):
         """
-        Simulates the camera movement via level scrolling mechanism
+        Simulates the camera movement by letting the camera follow the player,
+        the player stops at the walls the camera would push it into
         """
         bomberman_player = self.bomberman_player.sprite
-        player_x = bomberman_player.rect.centerx
-        direction_x = bomberman_player.direction.x
-        player_y = bomberman_player.rect.centery
-        direction_y = bomberman_player.direction.y
-        is_scroll_to_be_added = False
-
-        if player_x < Camera.CAMERA_X_LIMIT_LEFT.value and direction_x < 0:
-            #if player has reached left end of screen and wants to keep moving left
-            self.level_shift = (PlayerBomberman.SPEED.value,0)
-            bomberman_player.speed = 0
-            is_scroll_to_be_added = True
-        elif player_x > Camera.CAMERA_X_LIMIT_RIGHT.value and direction_x > 0:
-            #if player has reached right end of screen and wants to keep moving right
-            self.level_shift = (-PlayerBomberman.SPEED.value,0)
-            bomberman_player.speed = 0
-            is_scroll_to_be_added = True
-        elif player_y < Camera.CAMERA_Y_LIMIT_TOP.value and direction_y < 0:
-            #if player has reached top end of screen and wants to keep moving top
-            self.level_shift = (0,PlayerBomberman.SPEED.value)
-            bomberman_player.speed = 0
-            is_scroll_to_be_added = True
-        elif player_y > Camera.CAMERA_Y_LIMIT_BOTTOM.value and direction_y > 0:
-            #if player has reached bottom end of screen and wants to keep moving down
-            self.level_shift = (0,-PlayerBomberman.SPEED.value)
-            bomberman_player.speed = 0
-            is_scroll_to_be_added = True
-        else:
-            #if the player is within limits of screen - no scroll needed
-            self.level_shift = (0,0)
-            bomberman_player.speed = PlayerBomberman.SPEED.value
-            is_scroll_to_be_added = False
-        if is_scroll_to_be_added:
-            bomberman_player.level_shifted[0] += self.level_shift[0]
-            bomberman_player.level_shifted[1] += self.level_shift[1]
+        rect = bomberman_player.rect
+        start_x, start_y = rect.topleft
+        shift_x, shift_y = self.camera.follow(bomberman_player)
+        if not shift_x and not shift_y:
+            return
+        #the player moved with the camera, set it next to the walls it ran into
+        for sprite in self.walls.spatial_hash.query(rect):
+            if sprite.rect.colliderect(rect):
+                if shift_x < 0:
+                    rect.left = sprite.rect.right
+                elif shift_x > 0:
+                    rect.right = sprite.rect.left
+                elif shift_y < 0:
+                    rect.top = sprite.rect.bottom
+                else:
+                    rect.bottom = sprite.rect.top
+        #the camera only moves as far as the player did
+        self.camera.viewport.move_ip(rect.x - start_x - shift_x, rect.y - start_y - shift_y)
 
     def horizontal_collision(self):
         """
@@ -156,8 +201,8 @@ class Level:
         #move the player horizontally
         bomberman_player.rect.x += bomberman_player.direction.x * bomberman_player.speed
 
-        #detect collision with all game tiles in horizontal direction
-        for sprite in self.walls.sprites():
+        #detect collision with the game tiles around the player in horizontal direction
+        for sprite in self.walls.spatial_hash.query(bomberman_player.rect):
             if sprite.rect.colliderect(bomberman_player.rect):
                 if bomberman_player.direction.x < 0:
                     #if player collides with a tile and was moving left,
@@ -177,8 +222,8 @@ class Level:
         #move the player vertically
         bomberman_player.rect.y += bomberman_player.direction.y * bomberman_player.speed
 
-        #detect collision with all game tiles in vertical direction
-        for sprite in self.walls.sprites():
+        #detect collision with the game tiles around the player in vertical direction
+        for sprite in self.walls.spatial_hash.query(bomberman_player.rect):
             if sprite.rect.colliderect(bomberman_player.rect):
                 if bomberman_player.direction.y < 0:
                     #if player collides with a tile and was moving top,
@@ -192,32 +237,23 @@ class Level:
     def player_collides_with_explosion(self):
         """Check for player collision with explosion"""
         if not self.player_hit_invincible:
-            for bomb in self.bomberman_player.sprite.bombs:
-                for explosion in bomb.sprite.explosions:
-                    if explosion.sprite.rect.colliderect(self.bomberman_player.sprite.rect):
-                        self.player_hit_explosion = True
-            for bomb in Level.level_bombs:
-                for explosion in bomb.explosions:
-                    if explosion.sprite.rect.colliderect(self.bomberman_player.sprite.rect):
-                        self.player_hit_explosion = True
+            player_rect = self.bomberman_player.sprite.rect
+            if self.explosion_layer.collide(player_rect):
+                self.player_hit_explosion = True
 
 
     def enemy_collides_with_explosion(self):
         """Check if any enemy is hit by the explosion"""
-        for bomb in self.bomberman_player.sprite.bombs:
-            for explosion in bomb.sprite.explosions:
-                for enemy_sprite in self.bomberman_enemy.sprites():
-                    if explosion.sprite.rect.colliderect(enemy_sprite) and \
-                            not enemy_sprite.is_paused():
-                        enemy_sprite.enemy_hit_by_bomb()
-                        enemy_sprite.set_pause(30)
+        for enemy_sprite in self.bomberman_enemy.sprites():
+            if not enemy_sprite.is_paused() and \
+                    self.explosion_layer.collide(enemy_sprite.rect, level_bombs=False):
+                enemy_sprite.enemy_hit_by_bomb()
+                enemy_sprite.set_pause(30)
 
     def enemy_collision_reverse(self):
         """Redirect enemy after collision with wall."""
         for enemy_sprite in self.bomberman_enemy.sprites():
-            if pygame.sprite.spritecollide(enemy_sprite,
-                                           self.walls.sprites(),
-                                           False):
+            if self.walls.collide(enemy_sprite.rect):
                 enemy_sprite.enemy_collision()
 
     def enemy_collides_with_player(self):
@@ -233,68 +269,88 @@ class Level:
                 if enemy_sprite.rect.colliderect(self.bomberman_player.sprite.rect):
                     self.player_hit_enemy = True
 
-    def unavailable_locations_for_enemy(self, mapdata):
-        """Extract spots on the map where enemy cannot be placed."""
-        unavaiable_locations = []
-        for row_index, row in enumerate(mapdata):
-            for column_index, column in enumerate(row):
-                if column in ('W', '#', 'B_1', 'B_2', 'I', 'P'):
-                    unavaiable_locations.append((row_index, column_index))
-        return unavaiable_locations
-
-    def get_locations_for_enemy(self, mapdata):
-        """Get all possible random spots where enemy can be placed."""
-        median_row = int(len(mapdata)/2)
-        median_col = int(len(mapdata[0])/2)
-        unavailable_locations = self.unavailable_locations_for_enemy(mapdata)
-        number_of_iterations = 50
-        while number_of_iterations:
-            enemy_start_locations = [
-                (random.randint(median_row, len(mapdata) - 1),
-                 random.randint(median_col, len(mapdata[0]) - 1))
-                for i in range(0, 3)]
-            locations_conflicted = [True for location in enemy_start_locations
-                                    if location in unavailable_locations]
-            if not locations_conflicted:
-                break
-            number_of_iterations = - 1
-        return enemy_start_locations
-
-    def get_locations_for_gateway(self, mapdata):
+    @staticmethod
+    def unavailable_locations_for_enemy(grid: np.ndarray) -> np.ndarray:
+        """Mask of the spots on the map where enemy cannot be placed, every non empty cell."""
+        return grid != MapCell.EMPTY.value
+
+    def get_locations_for_enemy(self, unavailable_locations: np.ndarray):
+        """Get random free spots in the bottom right quadrant where enemies can be placed."""
+        rows, columns = unavailable_locations.shape
+        median_row = int(rows/2)
+        median_col = int(columns/2)
+        # every enemy gets its own free cell, at most as many enemies as free cells
+        free_cells = np.argwhere(~unavailable_locations[median_row:, median_col:]).tolist()
+        enemy_start_locations = self.rng.sample(free_cells, min(self.enemy_count, len(free_cells)))
+        return [(median_row + row_index, median_col + column_index)
+                for row_index, column_index in enemy_start_locations]
+
+    def get_locations_for_gateway(self, unavailable_locations: np.ndarray):
         """Get all possible random spots where gateway can be placed."""
-        unavailable_locations = self.unavailable_locations_for_enemy(mapdata)
+        rows, columns = unavailable_locations.shape
         number_of_iterations = 50
         while number_of_iterations:
             gateway_locations = [
-                (random.randint(2, len(mapdata) - 1),
-                 random.randint(1, len(mapdata[0]) - 1))
+                (self.rng.randint(2, rows - 1),
+                 self.rng.randint(1, columns - 1))
                 for i in range(0, 1)]
             locations_conflicted = [True for location in gateway_locations
-                                    if location in unavailable_locations]
+                                    if unavailable_locations[location]]
             if not locations_conflicted:
                 break
-            number_of_iterations = - 1
+            number_of_iterations -= 1
         return gateway_locations
 
     def item_collides_with_player(self):
         """Check for item collision with player."""
-        for item_sprite in self.items.sprites():
-            if item_sprite.rect.colliderect(self.bomberman_player.sprite.rect):
-                self.player_hit_item = True
-                self.item_class = item_sprite.item_num
-                if self.item_class == ItemType.SKATE.value:
-                    Level.player_hit_skate = True
-                elif self.item_class == ItemType.BOMB.value:
-                    Level.player_hit_bomb_length = True
-                elif self.item_class == ItemType.INVINCIBLE.value:
-                    self.player_hit_invincible = True
-                self.items.remove(item_sprite)
-
-    def render_and_update_bombs(self):
-        """render and update bombs placed by player in the level"""
+        for item_sprite in self.items.collide(self.bomberman_player.sprite.rect):
+            self.player_hit_item = True
+            self.item_class = item_sprite.item_num
+            if self.item_class == ItemType.SKATE.value:
+                self.bomberman_player.sprite.skate_active = True
+            elif self.item_class == ItemType.BOMB.value:
+                self.bomberman_player.sprite.bomb_length_active = True
+            elif self.item_class == ItemType.INVINCIBLE.value:
+                self.player_hit_invincible = True
+            if self.item_class != ItemType.EXTRA_TIME.value:
+                # the countdown runs from DURATION down to 0 and the effect ends once 0 passed
+                self.effects.start(ItemType(self.item_class),
+                                   (ItemEffect.DURATION.value + 1) * self.clock.fps)
+            self.items.remove(item_sprite)
+
+    def _effect_ended(self, item_type: Hashable):
+        """takes back the effect of an item once its timer ran out"""
+        if item_type == ItemType.SKATE:
+            self.bomberman_player.sprite.skate_active = False
+        elif item_type == ItemType.BOMB:
+            self.bomberman_player.sprite.bomb_length_active = False
+        elif item_type == ItemType.INVINCIBLE:
+            self.player_hit_invincible = False
+
+    def update_bombs(self):
+        """update bombs placed by player in the level"""
         for bomb in self.bomberman_player.sprite.bombs:
-            bomb.draw(self.display_surface)
-            bomb.update(self.level_shift)
+            bomb.sprite.update(self.is_on_screen(bomb.sprite.rect))
+
+    def update_level_bombs(self):
+        """update bombs revealed by breaking walls"""
+        for bomb in self.level_bombs.sprites():
+            bomb.update(self.is_on_screen(bomb.rect))
+
+    def is_on_screen(self, rect: pygame.Rect) -> bool:
+        """Check if a rect is drawn at all, animations of sprites off screen are skipped."""
+        return self.display_surface is not None and self.camera.is_visible(rect)
+
+    def all_bombs(self) -> List:
+        """Bombs placed by the player followed by the bombs revealed by breaking walls."""
+        return ([bomb.sprite for bomb in self.bomberman_player.sprite.bombs] +
+                self.level_bombs.sprites())
+
+    def render_bombs(self):
+        """queue bombs placed by player in the level and their explosions"""
+        self.camera.collect(self.render_queue,
+                            [bomb.sprite for bomb in self.bomberman_player.sprite.bombs])
+        self.explosion_layer.collect(self.render_queue, self.camera.viewport, from_player=True)
 
     #moved below code to bomb.py for better encapsulation, keep this commented here
     #in case we wanna undo anything
@@ -302,15 +358,137 @@ class Level:
     #    """render and update explosions caused by bombs placed by player in the level"""
     #    for bomb in self.bomberman_player.sprite.bombs:
     #        for expl in bomb.sprite.explosions:
-    #            expl.update(self.level_shift)
     #            expl.draw(self.display_surface)
 
-    @staticmethod
-    def _clean_up_level_bombs_after_explosion():
+    def index_explosions(self):
+        """sync the explosion layer with the bombs which exploded or left the level"""
+        self.explosion_layer.update(
+            (bomb.sprite for bomb in self.bomberman_player.sprite.bombs),
+            self.level_bombs)
+
+    def _clean_up_level_bombs_after_explosion(self):
         """remove bombs which have been exploded from levels internal list"""
-        for temp_bomb in Level.level_bombs.copy():
+        for temp_bomb in self.level_bombs.copy():
             if temp_bomb.has_explosion_ended:
-                Level.level_bombs.remove(temp_bomb)
+                self.level_bombs.remove(temp_bomb)
+                temp_bomb.release()
+
+    def release_bombs(self):
+        """Return all bombs to their pool, eg. when the level is dropped mid explosion"""
+        for temp_bomb in self.all_bombs():
+            temp_bomb.release()
+        self.bomberman_player.sprite.bombs.clear()
+        self.level_bombs.empty()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Captures the complete mutable state of the level, see `restore`.
+
+        The snapshot holds plain values and arrays only, no sprites, so keeping many
+        of them is cheap, eg. one per node of a search tree, and the same snapshot
+        can be restored any number of times.
+
+        Returns
+        -------
+        Dict[str, Any]
+            state of the clock, random number generator, camera, walls, items,
+            player, bombs, enemies, gateway, item effects and the flags of the level
+        """
+        walls = self._breakable_walls
+        player_sprite = self.bomberman_player.sprite
+        # every sprite belongs to one group of the level only, alive() tells if it is in the level
+        return {
+            "ticks": self.clock.ticks,
+            "rng": self.rng.getstate(),
+            "camera": self.camera.offset,
+            "walls_present": np.fromiter((wall.alive() for wall in walls), dtype=bool,
+                                         count=len(walls)),
+            "walls": np.array([wall.get_state() for wall in walls],
+                              dtype=np.uint8).reshape(-1, 3),
+            "items": tuple(index for index, item_sprite in enumerate(self._all_items)
+                           if item_sprite.alive()),
+            "player": player_sprite.get_state(),
+            "player_bombs": tuple(single.sprite.get_state() for single in player_sprite.bombs),
+            "level_bombs": tuple(level_bomb.get_state() for level_bomb in self.level_bombs),
+            "enemies": tuple((index, enemy_sprite.get_state())
+                             for index, enemy_sprite in enumerate(self._all_enemies)
+                             if enemy_sprite.alive()),
+            "gateway": bool(self.gateway),
+            "effects": self.effects.get_state(),
+            "flags": (self.player_hit_enemy, self.player_hit_item, self.player_hit_invincible,
+                      self.player_hit_explosion, self.player_hit_gateway, self.gateway_flag,
+                      self.item_class),
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        """
+        Puts the level back into a state returned by `snapshot`, in place.
+
+        The sprites, their images and the indexes of the level are reused and only
+        what changed since the snapshot is updated, which is much cheaper than
+        building the level again. The blast predictions of the danger map are
+        recomputed from the restored walls.
+
+        Parameters
+        ----------
+        state: Dict[str, Any]
+            snapshot taken from this level
+        """
+        self.clock.ticks = state["ticks"]
+        self.rng.setstate(state["rng"])
+        self.camera.viewport.topleft = state["camera"]
+        self._restore_walls(state["walls_present"], state["walls"])
+        self.items.empty()
+        self.items.add(*(self._all_items[index] for index in state["items"]))
+        self.bomberman_player.sprite.set_state(state["player"])
+        self._restore_bombs(state["player_bombs"], state["level_bombs"])
+        self.bomberman_enemy.empty()
+        for index, enemy_state in state["enemies"]:
+            self._all_enemies[index].set_state(enemy_state)
+            self.bomberman_enemy.add(self._all_enemies[index])
+        if not state["gateway"]:
+            self.gateway.empty()
+        elif not self.gateway:
+            self.set_gateway()
+        self.effects.set_state(state["effects"])
+        (self.player_hit_enemy, self.player_hit_item, self.player_hit_invincible,
+         self.player_hit_explosion, self.player_hit_gateway, self.gateway_flag,
+         self.item_class) = state["flags"]
+
+    def _restore_walls(self, present: np.ndarray, states: np.ndarray):
+        """brings the breakable walls back to their snapshot state, the wall listeners are told"""
+        for wall, is_present, wall_state in zip(self._breakable_walls, present.tolist(),
+                                                states.tolist()):
+            tile_type, contains_bomb, damaged = wall_state
+            changed = wall.get_state() != (tile_type, contains_bomb, damaged)
+            if changed:
+                wall.set_state((tile_type, bool(contains_bomb), bool(damaged)))
+            if is_present != wall.alive():
+                if is_present:
+                    self.walls.add(wall)
+                else:
+                    self.walls.remove(wall)
+            elif changed and is_present:
+                self.walls.mark_changed(wall)
+
+    def _restore_bombs(self, player_bombs: Sequence[Tuple], level_bombs: Sequence[Tuple]):
+        """returns the current bombs to their pool and places the bombs of a snapshot"""
+        self.release_bombs()
+        for bomb_state in player_bombs:
+            self.bomberman_player.sprite.bombs.append(self._acquire_bomb(bomb_state).single)
+        self.level_bombs.add(*(self._acquire_bomb(bomb_state) for bomb_state in level_bombs))
+        # recycled bombs may come back with the same start time, so nothing tracked is kept
+        self.danger_map.clear()
+        self.danger_map.update(self.all_bombs())
+        self.explosion_layer.clear()
+        self.index_explosions()
+
+    def _acquire_bomb(self, bomb_state: Tuple):
+        """bomb from the pool put into the given state"""
+        restored = BOMB_POOL.acquire(list(bomb_state[0]), bomb_state[1], self.walls,
+                                     self.level_bombs, self.clock)
+        restored.set_state(bomb_state)
+        return restored
 
     def get_player_location_on_map(self) -> tuple:
         """Get the player's current location."""
@@ -324,8 +502,6 @@ class Level:
 
     def set_gateway(self) :
         """Make a Gateway to next level when all enemies are killed"""
-        self.gateway_index[0] += self.shift_accumulated[0]
-        self.gateway_index[1] += self.shift_accumulated[1]
         self.gateway.add(gateway.Gateway(self.gateway_index))
 
     def gateway_collides_with_player(self):
@@ -337,14 +513,17 @@ class Level:
     def cheat_key(self):
         """cheat key for deleting all enemies"""
         # pylint: disable=no-member
-        keys = pygame.key.get_pressed()
+        keys = self.controls()
         if keys[pygame.K_0]:
             for enemy_sprite in self.bomberman_enemy.sprites():
                 enemy_sprite.kill()
 
-    def run(self):
-        """Graphically display all components of the level"""
-        self.scroll()
+    def step(self):
+        """Advance the level logic by one fixed timestep, without rendering anything"""
+        profiler = self.profiler
+        # effects which ran out end before the next tick is simulated
+        self.effects.update()
+        self.clock.tick()
 
         enemies_alive = self.get_enemy_count()
         if enemies_alive == 0 and not self.gateway_flag:
@@ -352,53 +531,96 @@ class Level:
             self.gateway_flag = True
 
         #handle level bombs spawned after breaking a wall
-        Level.level_bombs.draw(self.display_surface)
-        Level.level_bombs.update(self.level_shift)
-        Level._clean_up_level_bombs_after_explosion()
+        self.update_level_bombs()
+        self._clean_up_level_bombs_after_explosion()
+        profiler.lap("step.level_bombs")
 
         #handle items
-        self.items.update(self.level_shift)
-        self.items.draw(self.display_surface)
         self.item_collides_with_player()
-
-        #handle level tiles like walls
-        self.walls.update(self.level_shift)
-        self.walls.draw(self.display_surface)
+        profiler.lap("step.items")
 
         #handle player
         self.bomberman_player.update()
         self.horizontal_collision()
         self.vertical_collision()
-        self.bomberman_player.draw(self.display_surface)
-        # print(self.get_player_location_on_map())
+        profiler.lap("step.player")
+        #the camera follows the movement of this step
+        self.scroll()
+        profiler.lap("step.scroll")
 
         #handle bombs
-        self.render_and_update_bombs()
+        self.update_bombs()
+        self.danger_map.update(self.all_bombs())
+        profiler.lap("step.bombs")
 
         #handle explosions
         #self.render_and_update_explosions()
+        self.index_explosions()
         self.player_collides_with_explosion()
         self.enemy_collides_with_explosion()
-
-
-
-        #track camera movement
-        if self.level_shift != (0,0):
-            self.shift_accumulated[0] += self.level_shift[0]
-            self.shift_accumulated[1] += self.level_shift[1]
+        profiler.lap("step.explosions")
 
         # handle enemy
         self.enemy_collision_reverse()
         self.enemy_collides_with_player()
-        self.bomberman_enemy.update(self.level_shift,
-                                    self.unavailable_locations,
-                                    self.shift_accumulated)
-        self.bomberman_enemy.draw(self.display_surface)
+        if self.smart_enemies:
+            self.pathfinder.set_target(self.get_player_location_on_map())
+            self.bomberman_enemy.update(self.unavailable_locations, self.pathfinder,
+                                        self.danger_map)
+        else:
+            self.bomberman_enemy.update(self.unavailable_locations)
+        profiler.lap("step.enemies")
 
         #handle gateway
-        self.gateway.update(self.level_shift)
-        self.gateway.draw(self.display_surface)
         self.gateway_collides_with_player()
 
         #cheat key
         self.cheat_key()
+        profiler.lap("step.gateway")
+
+    def draw(self):
+        """
+        Graphically display all components of the level
+
+        Every layer is queued and the queue is drawn with a single call at the end,
+        images queued into `render_queue` beforehand, eg. a HUD, are drawn first.
+        """
+        profiler = self.profiler
+        queue = self.render_queue
+        viewport = self.camera.viewport
+        #handle level bombs spawned after breaking a wall
+        self.camera.collect(queue, self.level_bombs)
+        self.explosion_layer.collect(queue, viewport, from_player=False)
+        profiler.lap("draw.level_bombs")
+
+        #handle items
+        self.camera.collect(queue, self.items)
+        profiler.lap("draw.items")
+
+        #handle level tiles like walls
+        if self.wall_layer is None:
+            self.wall_layer = WallLayer(self.walls, self.map_size)
+        self.wall_layer.collect(queue, viewport)
+        profiler.lap("draw.walls")
+
+        #handle player
+        self.camera.collect(queue, self.bomberman_player)
+
+        #handle bombs
+        self.render_bombs()
+        profiler.lap("draw.player_bombs")
+
+        #handle enemy
+        self.camera.collect(queue, self.bomberman_enemy)
+
+        #handle gateway
+        self.camera.collect(queue, self.gateway)
+        profiler.lap("draw.enemies")
+
+        queue.flush(self.display_surface)
+        profiler.lap("draw.blits")
+
+    def run(self):
+        """Advance the level by one timestep and display it"""
+        self.step()
+        self.draw()
@@ -1,106 +1,108 @@
 """Main file to run the game."""
 import sys
-from pathlib import Path
-from typing import List
-import csv
+from typing import Optional
 import pygame
 from . import level
-from .settings import GameWindow
+from .catalog import LevelCatalog
+from .settings import Game, GameWindow
 from .constants import ItemType
+from .hud import Hud
+from .profiler import FrameProfiler
+from .render import DirtyRectTracker, update_display
 
-_SCREEN = pygame.display.set_mode((GameWindow.SCREEN_WIDTH.value, GameWindow.SCREEN_HEIGHT.value))
-_MAP_FOLDER = "maps"
+_LEVELS = LevelCatalog()
 _CLOCK = pygame.time.Clock()
 _TIMER_DURATION = 300
 _WHITE_FONT_TEXT = (255, 255, 255)
 _ITEM_COLOR = [(0, 0, 255), (255, 0, 0), (255, 255, 0)]
+# items whose effect counts down in the hud
+_TIMED_ITEMS = (ItemType.SKATE, ItemType.BOMB, ItemType.INVINCIBLE)
 
 
-def start_game(level_number: int):
-    """Run the game."""
+def start_game(level_number: int, profile: Optional[str] = None, dirty_rects: bool = False):
+    """
+    Run the game.
+
+    Parameters
+    ----------
+    level_number: int
+        Number of the level to play
+    profile: Optional[str]
+        Time the phases of every frame, show them in an overlay and write them
+        to <profile>.csv and <profile>.json when the game is closed
+    dirty_rects: bool
+        Present only the parts of the screen which changed since the last frame
+    """
     # pylint: disable=no-member
     # pylint: disable=too-many-branches
     # pylint: disable=too-many-statements
+    # pylint: disable=too-many-locals
     pygame.init()
+    screen = pygame.display.set_mode((GameWindow.SCREEN_WIDTH.value,
+                                      GameWindow.SCREEN_HEIGHT.value))
     pygame.display.set_caption("Smart-Bomberman")
-    level_maps = _get_all_levels()
-    level_map = level.Level(level_maps[level_number - 1], _SCREEN, level_number)
+    level_map = level.Level(_LEVELS.load(level_number), screen, level_number)
+    clock = level_map.clock
     font = pygame.font.Font(pygame.font.get_default_font(), 18)
     extra_time = 0
-    item_start = [0, 0, 0, 0]
-    item_seconds = [0, 0, 0, 0]
-    item_text = [font.render('', True, 0), font.render('', True, 0), font.render('', True, 0)]
-    item_duration = 15
+    hud = Hud(font)
+    frame_profiler = FrameProfiler(enabled=profile is not None)
+    level_map.profiler = frame_profiler
+    overlay_font = pygame.font.Font(pygame.font.get_default_font(), 14)
+    tracker = DirtyRectTracker() if dirty_rects else None
     while True:
-        time_remaining = max(0, _TIMER_DURATION + extra_time - pygame.time.get_ticks() // 1000)
+        frame_profiler.start_frame()
+        time_remaining = max(0, _TIMER_DURATION + extra_time - clock.seconds)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if profile is not None:
+                    frame_profiler.dump_csv(f"{profile}.csv")
+                    frame_profiler.dump_json(f"{profile}.json")
                 pygame.quit()
                 sys.exit()
+        frame_profiler.lap("events")
         enemies_alive = level_map.get_enemy_count()
         if level_map.player_hit_gateway:
             pygame.time.wait(1000)
-            _endgame_screen(font, time_remaining, enemies_alive)
-            pygame.display.update()
+            _endgame_screen(screen, font, time_remaining, enemies_alive)
+            update_display(screen, tracker)
             continue
         if level_map.player_hit_enemy or level_map.player_hit_explosion or time_remaining == 0:
             pygame.time.wait(1000)
-            _endgame_screen(font, time_remaining, enemies_alive)
-            pygame.display.update()
+            _endgame_screen(screen, font, time_remaining, enemies_alive)
+            update_display(screen, tracker)
             continue
         if level_map.player_hit_item:
+            # the other items are timed by the level, see Level.effects
             if level_map.item_class == ItemType.EXTRA_TIME.value:
                 extra_time += 30
-            for i in ItemType:
-                if level_map.item_class == i.value:
-                    item_start[i.value] = pygame.time.get_ticks()
-                elif level_map.item_class == ItemType.EXTRA_TIME.value:
-                    continue
             level_map.player_hit_item = False
-        timer_text = font.render(f'Time Remaining: {time_remaining}', True, _WHITE_FONT_TEXT)
-        for i in ItemType:
-            if i.value == ItemType.EXTRA_TIME.value:
-                continue
-            item_seconds[i.value] = (pygame.time.get_ticks() - item_start[i.value])  // 1000
-            if item_start[i.value] == 0:
-                item_text[i.value] = font.render('', True, 0)
+        hud.set_text("timer", f'Time Remaining: {time_remaining}', _WHITE_FONT_TEXT, (10, 10))
+        for i in _TIMED_ITEMS:
+            ticks_left = level_map.effects.remaining(i)
+            if ticks_left is None:
+                hud.clear(i)
             else:
-                if item_seconds[i.value] > item_duration:
-                    if i.value == ItemType.SKATE.value:
-                        level.Level.player_hit_skate = False
-                    elif i.value == ItemType.BOMB.value:
-                        level.Level.player_hit_bomb_length = False
-                    elif i.value == ItemType.INVINCIBLE.value:
-                        level_map.player_hit_invincible = False
-                    item_start[i.value] = 0
-                remain = item_duration - item_seconds[i.value]
-                item_text[i.value] = font.render(f'{i.name}: {remain}', True, _ITEM_COLOR[i.value])
-        _SCREEN.fill((128, 128, 128)) #fill bg with grey color
-        _SCREEN.blit(timer_text, (10, 10))
-        for i in ItemType:
-            if i.value == ItemType.EXTRA_TIME.value:
-                continue
-            _SCREEN.blit(item_text[i.value], (220 + 120*i.value, 10))
+                remain = (ticks_left - 1) // clock.fps
+                hud.set_text(i, f'{i.name}: {remain}', _ITEM_COLOR[i.value],
+                             (220 + 120*i.value, 10))
+        screen.fill((128, 128, 128)) #fill bg with grey color
+        # the hud is queued below the level and drawn along with it
+        hud.collect(level_map.render_queue)
+        frame_profiler.lap("hud")
         level_map.run()
-        _CLOCK.tick(60)
-        pygame.display.update()
-
-
-def _get_all_levels() -> List:
-    """Read  and store different maps."""
-    map_path = Path.cwd().joinpath(_MAP_FOLDER)
-    available_level_files = list(map_path.iterdir())
-    all_maps = []
-    for level_file in available_level_files:
-        with open(level_file, newline='', encoding="utf-8-sig") as file:
-            reader = csv.reader(file)
-            all_maps.append(list(reader))
-    return all_maps
+        frame_profiler.draw_overlay(screen, overlay_font)
+        frame_profiler.lap("overlay")
+        _CLOCK.tick(Game.FPS.value)
+        frame_profiler.lap("wait")
+        update_display(screen, tracker)
+        frame_profiler.lap("display")
+        frame_profiler.end_frame()
 
 
-def _endgame_screen(font, time_remaining, enemies_alive):
+def _endgame_screen(screen, font, time_remaining, enemies_alive):
     """Endgame screen once player is killed."""
-    _SCREEN.fill("black")
+    screen.fill("black")
     text_to_render = ""
     if enemies_alive > 0:
         text_to_render = "GAMEOVER"
@@ -109,5 +111,5 @@ def _endgame_screen(font, time_remaining, enemies_alive):
     gameover_text = font.render(text_to_render, True, _WHITE_FONT_TEXT)
     if time_remaining == 0:
         time_up_text = font.render("You ran out of time!", True, _WHITE_FONT_TEXT)
-        _SCREEN.blit(time_up_text, (150, 200))
-    _SCREEN.blit(gameover_text,  (150, 150))
+        screen.blit(time_up_text, (150, 200))
+    screen.blit(gameover_text,  (150, 150))
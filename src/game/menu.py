@@ -1,14 +1,33 @@
 """Setting up the Main Menu of the Game"""
 
+from typing import Optional, Tuple
 import pygame
 # from .settings import GameWindow
 from .maingame import start_game
 from .utils.fileutils import import_sprite
 # from pathlib import Path
 from .button import Button
+from .render import DirtyRectTracker, update_display
 
 
-def main_menu(level_number: int):
+def _menu_buttons(background: pygame.Surface) -> Tuple[Button, Button, Button]:
+    """play, score and exit buttons stacked below the middle of the background"""
+    # pylint: disable=line-too-long
+    #https://www.freepik.com/premium-vector/set-pixel-graphics-icons-game-art-play-buttons-animation_36747298.htm
+    play_img = import_sprite("graphics/Start.png")
+    score_img = import_sprite("graphics/Score.png")
+    exit_img = import_sprite("graphics/Exit.png")
+
+    height_align = 70
+    width_align = 60
+
+    play_but = Button((background.get_width()/2)-width_align,background.get_height()/2, play_img, 0.3)
+    score_but = Button((background.get_width()/2)-width_align,(background.get_height()/2)+height_align, score_img, 0.3)
+    exit_but = Button((background.get_width()/2)-width_align,(background.get_height()/2)+(height_align*2), exit_img, 0.3)
+    return play_but, score_but, exit_but
+
+
+def main_menu(level_number: int, profile: Optional[str] = None, dirty_rects: bool = False):
     """
     Run the game via Menu
 
@@ -16,6 +35,10 @@ def main_menu(level_number: int):
     ----------
     level_number: int
         initial level of the map
+    profile: Optional[str]
+        profile the frames of the game and dump the timings to <profile>.csv/.json
+    dirty_rects: bool
+        present only the parts of the screen which changed since the last frame
     """
     # pylint: disable=no-member
     # pylint: disable=line-too-long
@@ -27,24 +50,15 @@ def main_menu(level_number: int):
     SCREEN = pygame.display.set_mode((BG.get_width(),BG.get_height())) # pylint: disable=invalid-name
     pygame.display.set_caption("Menu")
 
-    #https://www.freepik.com/premium-vector/set-pixel-graphics-icons-game-art-play-buttons-animation_36747298.htm
-    play_img = import_sprite("graphics/Start.png")
-    score_img = import_sprite("graphics/Score.png")
-    exit_img = import_sprite("graphics/Exit.png")
-
-    height_align = 70
-    width_align = 60
-
-    play_but = Button((BG.get_width()/2)-width_align,BG.get_height()/2, play_img, 0.3)
-    score_but = Button((BG.get_width()/2)-width_align,(BG.get_height()/2)+height_align, score_img, 0.3)
-    exit_but = Button((BG.get_width()/2)-width_align,(BG.get_height()/2)+(height_align*2), exit_img, 0.3)
+    play_but, score_but, exit_but = _menu_buttons(BG)
 
+    tracker = DirtyRectTracker() if dirty_rects else None
     run = True
     while run:
         SCREEN.blit(BG, (0,0))
 
         if play_but.draw(SCREEN):
-            start_game(level_number)
+            start_game(level_number, profile, dirty_rects)
         if score_but.draw(SCREEN):
             pass
         if exit_but.draw(SCREEN):
@@ -54,7 +68,7 @@ def main_menu(level_number: int):
             if event.type == pygame.QUIT:
                 run = False
 
-        pygame.display.update()
+        update_display(SCREEN, tracker)
 
     pygame.quit()
     
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""Encoding of the level state as a multi-channel grid for agents."""
+from typing import List, Optional, Set, Tuple, Union
+import numpy as np
+from .broadphase import Cell
+from .constants import BombItem, ObservationChannel
+from .settings import Game
+
+# (channel, row, column) index of a grid entry
+_Entry = Tuple[int, int, int]
+
+_WALL_CHANNELS = slice(ObservationChannel.WALL.value,
+                       ObservationChannel.WALL_ONE_EXPLOSION_NO_BOMB.value + 1)
+
+
+def observation_shape(level_data: Union[List, np.ndarray]) -> Tuple[int, int, int]:
+    """
+    Shape (channels, rows, columns) of the observation of a level.
+
+    Parameters
+    ----------
+    level_data: Union[List, np.ndarray]
+        The Map layout of the level, or the grid of a compiled map
+    """
+    if isinstance(level_data, np.ndarray):
+        rows, columns = level_data.shape
+        return len(ObservationChannel), rows, columns
+    return (len(ObservationChannel),
+            len(level_data),
+            max(len(row) for row in level_data))
+
+
+def encode_observation(level_map, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Encodes walls, player, enemies, bombs, explosions and visible items of a level
+    into a `np.uint8` grid with one channel per `ObservationChannel`.
+
+    Wall channels hold 1 where a wall of that tile type is. The bomb channel holds
+    the ticks left until the bomb explodes, all other channels count the entities
+    in a cell. The whole grid is rebuilt, `ObservationEncoder` keeps one up to
+    date instead.
+
+    Parameters
+    ----------
+    level_map: level.Level
+        the level to observe
+    out: Optional[np.ndarray]
+        array to write the observation into, a new one is created when not given
+    """
+    if out is None:
+        out = np.zeros(observation_shape(level_map.grid), dtype=np.uint8)
+    else:
+        out.fill(0)
+    for wall in level_map.walls:
+        _set_wall(out, wall)
+    _encode_entities(level_map, out)
+    return out
+
+
+class ObservationEncoder:
+    # pylint: disable=too-few-public-methods
+    """
+    Keeps the observation of a level up to date between steps.
+
+    Walls are written once, afterwards only the cells reported by the wall group
+    are rewritten. The entries written for the player, enemies, bombs,
+    explosions and items are remembered and cleared on the next update, so an
+    update costs time in the number of entities and not in the size of the map.
+    The grid always equals `encode_observation` of the level.
+
+    Parameters
+    ----------
+    level_map: level.Level
+        the level to observe
+    """
+
+    def __init__(self, level_map):
+        self.level_map = level_map
+        self.grid = np.zeros(observation_shape(level_map.grid), dtype=np.uint8)
+        for wall in level_map.walls:
+            _set_wall(self.grid, wall)
+        self._entity_entries = _encode_entities(level_map, self.grid)
+        self._dirty_cells: Set[Cell] = set()
+        level_map.walls.add_listener(self._dirty_cells.add)
+
+    def update(self) -> np.ndarray:
+        """
+        Brings the grid up to date with the level and returns it.
+
+        The returned array is updated in place by the following calls.
+        """
+        walls = self.level_map.walls
+        tile_size = Game.TILE_SIZE.value
+        for column, row in self._dirty_cells:
+            self.grid[_WALL_CHANNELS, row, column] = 0
+            wall = walls.wall_at((column * tile_size, row * tile_size))
+            if wall is not None:
+                _set_wall(self.grid, wall)
+        self._dirty_cells.clear()
+        for entry in self._entity_entries:
+            self.grid[entry] = 0
+        self._entity_entries = _encode_entities(self.level_map, self.grid)
+        return self.grid
+
+
+def _set_wall(out: np.ndarray, wall):
+    """marks the wall in the channel of its tile type"""
+    tile_size = Game.TILE_SIZE.value
+    out[wall.tile_type.value, wall.rect.y // tile_size, wall.rect.x // tile_size] = 1
+
+
+def _encode_entities(level_map, out: np.ndarray) -> List[_Entry]:
+    """writes everything but the walls into the grid, returns the written entries"""
+    entries: List[_Entry] = []
+    for item_sprite in level_map.items:
+        if level_map.walls.wall_at(item_sprite.rect.topleft) is None:
+            _add(out, ObservationChannel.ITEM, item_sprite.rect, entries)
+
+    bomberman_player = level_map.bomberman_player.sprite
+    _add(out, ObservationChannel.PLAYER, bomberman_player.rect, entries)
+
+    for enemy_sprite in level_map.bomberman_enemy:
+        _add(out, ObservationChannel.ENEMY, enemy_sprite.rect, entries)
+
+    tile_size = Game.TILE_SIZE.value
+    fuse_ticks = BombItem.EXPLOSION_TIME_DURATION.value * level_map.clock.fps
+    for column, row in level_map.explosion_layer.cells():
+        _add_cell(out, ObservationChannel.EXPLOSION, column, row, entries)
+    for bomb in level_map.all_bombs():
+        if not bomb.has_bomb_exploded:
+            ticks_left = fuse_ticks - (level_map.clock.ticks - bomb.start_time)
+            _add_cell(out, ObservationChannel.BOMB, bomb.rect.centerx // tile_size,
+                      bomb.rect.centery // tile_size, entries, value=min(max(ticks_left, 1), 255))
+    return entries
+
+
+def _add(out: np.ndarray, channel: ObservationChannel, rect, entries: List[_Entry]):
+    """counts an entity in the cell containing the center of its rect"""
+    _add_cell(out, channel, rect.centerx // Game.TILE_SIZE.value,
+              rect.centery // Game.TILE_SIZE.value, entries)
+
+
+def _add_cell(out: np.ndarray, channel: ObservationChannel, column: int, row: int,
+              entries: List[_Entry], *, value: Optional[int] = None):
+    # pylint: disable=too-many-arguments
+    """
+    counts an entity in the given cell, or writes the value instead when given,
+    entities off the map are left out
+    """
+    if 0 <= row < out.shape[1] and 0 <= column < out.shape[2]:
+        entry = (channel.value, row, column)
+        out[entry] = min(out[entry] + 1, 255) if value is None else value
+        entries.append(entry)
@@ -1,12 +1,12 @@
 """Setting up the player character, interaction"""
-# pylint: disable=cyclic-import
 
-from typing import Tuple, List
+from typing import Callable, Tuple, List, Optional
 import pygame
 from .constants import PlayerBomberman, PlayerStatus
 from .utils.fileutils import import_from_spritesheet
+from .walls import WallGroup
+from .clock import TickClock
 from . import bomb
-from . import level
 from .settings import Game
 
 class Player(pygame.sprite.Sprite):
@@ -17,15 +17,24 @@ class Player(pygame.sprite.Sprite):
     # pylint: disable=too-many-instance-attributes
 
     def __init__(self, position: Tuple,
-                 walls: pygame.sprite.Group,
-                 display_surface: pygame.Surface):
+                 walls: WallGroup,
+                 level_bombs: pygame.sprite.Group,
+                 clock: TickClock,
+                 controls: Optional[Callable] = None):
         """ 
         Parameters
         ----------
         position: Tuple
             initial position of the player on map
-        walls: pygame.sprite.Group
-            group representing all the wall sprites in level
+        walls: WallGroup
+            grid indexed group of all the wall sprites in level
+        level_bombs: pygame.sprite.Group
+            group collecting the bombs revealed by breaking a wall
+        clock: TickClock
+            simulation clock of the level
+        controls: Optional[Callable]
+            returns the pressed state of the keys like `pygame.key.get_pressed`,
+            which is used when not given
         """
         # pylint: disable=no-member
         # pylint: disable=c-extension-no-member
@@ -46,13 +55,15 @@ class Player(pygame.sprite.Sprite):
         self.bomb_range = PlayerBomberman.BOMB_RANGE.value
         self.bomb_limit = PlayerBomberman.BOMB_LIMIT.value
         self.walls = walls
-        self.display_surface = display_surface
+        self.level_bombs = level_bombs
+        self.clock = clock
+        self.controls = controls if controls is not None else pygame.key.get_pressed
+        self.skate_active = False
+        self.bomb_length_active = False
 
         # to ensure that holding down bomb deploy button doesnt spam bombs
         self.bomb_deploy_key_pressed = False
 
-        self.level_shifted = [0,0]
-
     def build_player_animation_spritesheet(self):
         """creates an internal dictionary of player state animations"""
         self.animations = {PlayerStatus.IDLE: [], PlayerStatus.RUN: []}
@@ -80,9 +91,9 @@ class Player(pygame.sprite.Sprite):
         """
         # pylint: disable=no-member
         # pylint: disable=c-extension-no-member
-        keys = pygame.key.get_pressed()
+        keys = self.controls()
 
-        if level.Level.player_hit_skate:
+        if self.skate_active:
             player_vel = 2
         else:
             player_vel = 1
@@ -102,9 +113,7 @@ class Player(pygame.sprite.Sprite):
             if ( keys[pygame.K_x] and len(self.bombs) < self.bomb_limit
                                   and not self.bomb_deploy_key_pressed ):
                 self.bomb_deploy_key_pressed = True
-                temp_bomb = pygame.sprite.GroupSingle()
-                temp_bomb.add(self.deploy_bomb())
-                self.bombs.append(temp_bomb)
+                self.bombs.append(self.deploy_bomb().single)
             elif not keys[pygame.K_x]:
                 self.bomb_deploy_key_pressed = False
 
@@ -118,61 +127,61 @@ class Player(pygame.sprite.Sprite):
     def deploy_bomb(self) -> pygame.sprite.Sprite:
         """places the bomb on level"""
         bomb_deploy_pos = self._get_grid_aligned_bomb_position([self.rect.x, self.rect.y])
-        if level.Level.player_hit_bomb_length:
+        if self.bomb_length_active:
             bomb_length = self.bomb_range + 1
         else:
             bomb_length = self.bomb_range
-        return bomb.Bomb(bomb_deploy_pos, bomb_length, self.walls, self.display_surface)
+        return bomb.BOMB_POOL.acquire(bomb_deploy_pos, bomb_length, self.walls,
+                                      self.level_bombs, self.clock)
 
     def _clean_up_bombs_after_explosion(self):
         """remove bombs which have been exploded from players internal list"""
         for temp_bomb in self.bombs.copy():
             if temp_bomb.sprite.has_explosion_ended:
                 self.bombs.remove(temp_bomb)
+                temp_bomb.sprite.release()
 
-    def _get_grid_aligned_bomb_position(self, position):
-        """grid align the bombs based on level shift and offset"""
-        # pylint: disable=too-many-branches
-        # calculate level offset based on overall level shift
-        level_offset = [0,0]
-        if (abs(self.level_shifted[0])%Game.TILE_SIZE.value) != 0:
-            level_offset[0] = Game.TILE_SIZE.value-(abs(self.level_shifted[0])%Game.TILE_SIZE.value)
-        if (abs(self.level_shifted[1])%Game.TILE_SIZE.value) != 0:
-            level_offset[1] = Game.TILE_SIZE.value-(abs(self.level_shifted[1])%Game.TILE_SIZE.value)
-        # add offset to current bomb position
-        if self.level_shifted[0] < 0:
-            position[0] -= level_offset[0]
-        elif self.level_shifted[0] > 0:
-            position[0] += level_offset[0]
-        if self.level_shifted[1] < 0:
-            position[1] -= level_offset[1]
-        elif self.level_shifted[0] > 0:
-            position[1] += level_offset[1]
-        # grid alignment code below - based on tile size
+    @staticmethod
+    def _get_grid_aligned_bomb_position(position):
+        """grid align the bombs based on tile size"""
         grid_aligned_pos = position
-        if position[0] % Game.TILE_SIZE.value != 0:
-            if position[0] % Game.TILE_SIZE.value < (Game.TILE_SIZE.value // 2):
-                grid_aligned_pos[0] = position[0] - (position[0]%Game.TILE_SIZE.value)
-            else:
-                grid_aligned_pos[0] = ( Game.TILE_SIZE.value +
-                                      ((position[0] // Game.TILE_SIZE.value)*Game.TILE_SIZE.value))
-        if position[1] % Game.TILE_SIZE.value != 0:
-            if position[1] % Game.TILE_SIZE.value < (Game.TILE_SIZE.value // 2):
-                grid_aligned_pos[1] = position[1] - (position[1]%Game.TILE_SIZE.value)
+        for axis in (0, 1):
+            remainder = position[axis] % Game.TILE_SIZE.value
+            if remainder < (Game.TILE_SIZE.value // 2):
+                grid_aligned_pos[axis] = position[axis] - remainder
             else:
-                grid_aligned_pos[1] = ( Game.TILE_SIZE.value +
-                                      ((position[1] // Game.TILE_SIZE.value)*Game.TILE_SIZE.value))
-        # add the level offset back after grid alignment
-        if self.level_shifted[0] < 0:
-            grid_aligned_pos[0] += level_offset[0]
-        elif self.level_shifted[0] > 0:
-            grid_aligned_pos[0] -= level_offset[0]
-        if self.level_shifted[1] < 0:
-            grid_aligned_pos[1] += level_offset[1]
-        elif self.level_shifted[0] > 0:
-            grid_aligned_pos[1] -= level_offset[1]
+                grid_aligned_pos[axis] = position[axis] - remainder + Game.TILE_SIZE.value
         return grid_aligned_pos
 
+    def get_state(self) -> Tuple:
+        """
+        Compact copy of the mutable state of the player, see `set_state`.
+
+        The bombs placed by the player are not part of it, they are captured by the
+        level along with the bombs revealed by breaking walls.
+        """
+        return (tuple(self.rect), (self.direction.x, self.direction.y), self.speed,
+                self.status.value, self.frame_index, self.bomb_range, self.bomb_limit,
+                self.skate_active, self.bomb_length_active, self.bomb_deploy_key_pressed)
+
+    def set_state(self, state: Tuple):
+        """
+        Puts the player back into a state returned by `get_state`.
+
+        Parameters
+        ----------
+        state: Tuple
+            state of the player
+        """
+        # pylint: disable=c-extension-no-member
+        (rect, direction, self.speed, status, self.frame_index, self.bomb_range,
+         self.bomb_limit, self.skate_active, self.bomb_length_active,
+         self.bomb_deploy_key_pressed) = state
+        self.rect.update(rect)
+        self.direction = pygame.math.Vector2(direction)
+        self.status = PlayerStatus(status)
+        self.image = self.animations[self.status][int(self.frame_index)]
+
     def update(self):
         """
         updates player state like position based on input
@@ -0,0 +1,179 @@
+"""Opt-in timing of the phases of every frame, eg. to catch slow frames on big maps."""
+from collections import deque
+import csv
+import json
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+import pygame
+
+PERCENTILES = (50, 95, 99)
+# total time of a frame, from `start_frame` to `end_frame`
+FRAME = "frame"
+# frames between two refreshes of the overlay text, rendering it every frame would skew the timings
+_OVERLAY_REFRESH = 30
+_OVERLAY_BACKGROUND = (0, 0, 0, 160)
+_OVERLAY_TEXT = (255, 255, 255)
+
+
+class FrameProfiler:
+    # pylint: disable=too-many-instance-attributes
+    """
+    Times the phases of the frames and keeps rolling statistics of them.
+
+    A frame is timed from `start_frame` to `end_frame`, every `lap` in between
+    closes a phase and books the time since the previous lap, or the frame
+    start, on it. Only the last `window` frames are kept, the percentiles are
+    rolling over them. A disabled profiler ignores all calls, so it can stay in
+    place when nobody is profiling.
+
+    Parameters
+    ----------
+    enabled: bool
+        time the frames, otherwise every call returns right away
+    window: int
+        number of most recent frames the statistics are computed over
+    """
+
+    def __init__(self, enabled: bool = True, window: int = 600):
+        self.enabled = enabled
+        self.window = window
+        # (frame number, milliseconds per phase) of the most recent frames
+        self.frames: Deque[Tuple[int, Dict[str, float]]] = deque(maxlen=window)
+        self.frame_count = 0
+        # every phase seen so far, in the order they were first timed
+        self.phases: Dict[str, None] = {}
+        self._current: Dict[str, float] = {}
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._overlay: Optional[pygame.Surface] = None
+
+    def start_frame(self):
+        """Starts timing a new frame."""
+        if not self.enabled:
+            return
+        self._current = {}
+        self._frame_start = self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        """
+        Books the time since the previous lap on a phase of the current frame.
+
+        Parameters
+        ----------
+        phase: str
+            name of the phase which just ended, laps of the same phase add up
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + (now - self._last) * 1e3
+        self._last = now
+        if phase not in self.phases:
+            self.phases[phase] = None
+
+    def end_frame(self):
+        """Finishes the current frame and adds it to the statistics."""
+        if not self.enabled:
+            return
+        self._current[FRAME] = (time.perf_counter() - self._frame_start) * 1e3
+        self.frames.append((self.frame_count, self._current))
+        self.frame_count += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Statistics of every phase over the frames in the window.
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            phase -> mean, max and percentiles (p50, p95, p99) in milliseconds,
+            frames which skipped a phase count as 0 for it
+        """
+        stats = {}
+        for phase in [FRAME] + list(self.phases):
+            samples = np.array([timings.get(phase, 0.0) for _, timings in self.frames])
+            if samples.size == 0:
+                continue
+            stats[phase] = {"mean": float(samples.mean()), "max": float(samples.max())}
+            for percentile, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+                stats[phase][f"p{percentile}"] = float(value)
+        return stats
+
+    def dump_csv(self, path: str):
+        """
+        Writes the timings of the frames in the window, one row per frame.
+
+        Parameters
+        ----------
+        path: str
+            file the csv is written to
+        """
+        columns = [FRAME] + list(self.phases)
+        with open(path, "w", newline='', encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame_number"] + [f"{column}_ms" for column in columns])
+            for frame_number, timings in self.frames:
+                writer.writerow([frame_number] +
+                                [f"{timings.get(column, 0.0):.4f}" for column in columns])
+
+    def dump_json(self, path: str):
+        """
+        Writes the statistics of the window.
+
+        Parameters
+        ----------
+        path: str
+            file the json is written to
+        """
+        report = {"frames": self.frame_count, "window": len(self.frames),
+                  "milliseconds": self.summary()}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    def draw_overlay(self, surface: pygame.Surface, font: pygame.font.Font,
+                     position: Tuple[int, int] = (10, 40)):
+        """
+        Draws a table of the phase percentiles on top of the frame.
+
+        Parameters
+        ----------
+        surface: pygame.Surface
+            surface to draw on
+        font: pygame.font.Font
+            font of the table
+        position: Tuple[int, int]
+            top left corner of the table on the surface
+        """
+        if not self.enabled:
+            return
+        if self._overlay is None or self.frame_count % _OVERLAY_REFRESH == 0:
+            self._overlay = self._render_overlay(font)
+        surface.blit(self._overlay, position)
+
+    def _render_overlay(self, font: pygame.font.Font) -> pygame.Surface:
+        """renders the table of the overlay once, it is reused until the next refresh"""
+        # pylint: disable=no-member
+        rows = self._overlay_rows()
+        # cells are rendered one by one and right aligned, so the columns line up in any font
+        rendered = [[font.render(cell, True, _OVERLAY_TEXT) for cell in row] for row in rows]
+        widths = [max(row[column].get_width() for row in rendered) + 12
+                  for column in range(len(rows[0]))]
+        line_height = font.get_linesize()
+        overlay = pygame.Surface((sum(widths) + 8, line_height * len(rendered) + 8),
+                                 pygame.SRCALPHA)
+        overlay.fill(_OVERLAY_BACKGROUND)
+        for index, row in enumerate(rendered):
+            left = 4
+            for column, (text, width) in enumerate(zip(row, widths)):
+                x_position = left if column == 0 else left + width - text.get_width()
+                overlay.blit(text, (x_position, 4 + index * line_height))
+                left += width
+        return overlay
+
+    def _overlay_rows(self) -> List[List[str]]:
+        """cells of the overlay table, a header followed by the percentiles of every phase"""
+        rows = [["ms"] + [f"p{percentile}" for percentile in PERCENTILES]]
+        for phase, stats in self.summary().items():
+            rows.append([phase] + [f"{stats[f'p{percentile}']:.2f}" for percentile in PERCENTILES])
+        return rows
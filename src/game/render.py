@@ -0,0 +1,177 @@
+"""Batching the draw calls of a frame and presenting only the parts of the screen which changed."""
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import pygame
+from .settings import Game
+
+# image and top left screen position of a single draw call
+BlitEntry = Tuple[pygame.Surface, Tuple[int, int]]
+
+
+class RenderQueue:
+    """
+    Draw calls of a frame, collected in painting order and submitted at once.
+
+    Every layer of a frame adds its visible images instead of blitting them one
+    by one, `flush` hands all of them to a single `Surface.fblits` call where
+    pygame-ce provides it, otherwise to `Surface.blits`. Entries drawn later
+    paint over earlier ones, the same as separate blits in the same order.
+    """
+
+    def __init__(self):
+        self._entries: List[BlitEntry] = []
+
+    def add(self, image: pygame.Surface, position: Tuple[int, int]):
+        """
+        Queues one image.
+
+        Parameters
+        ----------
+        image: pygame.Surface
+            image to draw
+        position: Tuple[int, int]
+            top left corner of the image on the target surface
+        """
+        self._entries.append((image, position))
+
+    def extend(self, entries: Iterable[BlitEntry]):
+        """
+        Queues several images.
+
+        Parameters
+        ----------
+        entries: Iterable[BlitEntry]
+            (image, top left corner on the target surface) pairs
+        """
+        self._entries.extend(entries)
+
+    def flush(self, surface: pygame.Surface):
+        """
+        Draws the queued images onto the surface and empties the queue.
+
+        Parameters
+        ----------
+        surface: pygame.Surface
+            surface to draw on
+        """
+        if not self._entries:
+            return
+        fblits = getattr(surface, "fblits", None)
+        if fblits is not None:
+            fblits(self._entries)
+        else:
+            surface.blits(self._entries, doreturn=False)
+        self._entries.clear()
+
+    def clear(self):
+        """Drops the queued images without drawing them."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DirtyRectTracker:
+    """
+    Finds the parts of a surface which changed since the previous frame.
+
+    The surface is compared with a copy of the previous frame in square tiles and
+    the changed tiles of every tile row are merged into runs, which can be passed
+    to `pygame.display.update` instead of updating the whole screen. The
+    comparison sees every change, no matter who drew it, so nothing has to report
+    what it draws. While most of the surface changes, eg. while the camera
+    scrolls, and for surfaces which are not 32 bit, the whole surface is
+    reported as one rect.
+
+    Parameters
+    ----------
+    tile_size: int
+        width and height of the tiles the surface is compared in
+    full_update_ratio: float
+        fraction of changed tiles from which the whole surface is reported
+    """
+
+    def __init__(self, tile_size: int = Game.TILE_SIZE.value, full_update_ratio: float = 0.5):
+        self.tile_size = tile_size
+        self.full_update_ratio = full_update_ratio
+        self._previous: Optional[np.ndarray] = None
+
+    def dirty_rects(self, surface: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Parts of the surface which changed since the previous call.
+
+        Parameters
+        ----------
+        surface: pygame.Surface
+            the surface of the current frame, usually the display surface
+
+        Returns
+        -------
+        List[pygame.Rect]
+            changed areas, empty when nothing changed
+        """
+        changed = self._changed_pixels(surface)
+        if changed is None:
+            return [surface.get_rect()]
+        tiles = self._changed_tiles(changed)
+        if tiles.mean() >= self.full_update_ratio:
+            return [surface.get_rect()]
+        bounds = surface.get_rect()
+        tile = self.tile_size
+        rects = []
+        for row in np.flatnonzero(tiles.any(axis=1)).tolist():
+            columns = np.flatnonzero(tiles[row])
+            # split the changed columns of the row into runs of neighbouring tiles
+            for run in np.split(columns, np.flatnonzero(np.diff(columns) > 1) + 1):
+                rect = pygame.Rect(int(run[0]) * tile, row * tile, len(run) * tile, tile)
+                rects.append(rect.clip(bounds))
+        return rects
+
+    def reset(self):
+        """Forgets the previous frame, the next call reports the whole surface."""
+        self._previous = None
+
+    def _changed_pixels(self, surface: pygame.Surface) -> Optional[np.ndarray]:
+        """(height, width) mask of the pixels which changed, None to update everything"""
+        if surface.get_bytesize() != 4:
+            self._previous = None
+            return None
+        # rows of the surface are contiguous in memory, comparing them row by row is
+        # several times faster than the (width, height) order of surfarray. The pixel
+        # view locks the surface until it is dropped at the end of this call
+        pixels = pygame.surfarray.pixels2d(surface).T
+        if self._previous is None or self._previous.shape != pixels.shape:
+            self._previous = pixels.copy()
+            return None
+        changed = pixels != self._previous
+        np.copyto(self._previous, pixels)
+        return changed
+
+    def _changed_tiles(self, changed: np.ndarray) -> np.ndarray:
+        """(rows, columns) mask of the tiles holding a changed pixel"""
+        tile = self.tile_size
+        height, width = changed.shape
+        full_rows = height // tile
+        rows = changed[:full_rows * tile].reshape(full_rows, tile, width).any(axis=1)
+        if height % tile:
+            rows = np.vstack([rows, changed[full_rows * tile:].any(axis=0)])
+        return np.logical_or.reduceat(rows, np.arange(0, width, tile), axis=1)
+
+
+def update_display(surface: pygame.Surface, tracker: Optional[DirtyRectTracker] = None):
+    """
+    Presents the frame drawn on the display surface.
+
+    Parameters
+    ----------
+    surface: pygame.Surface
+        the display surface
+    tracker: Optional[DirtyRectTracker]
+        only the parts it reports as changed are presented, the whole screen when not given
+    """
+    if tracker is None:
+        pygame.display.update()
+        return
+    rects = tracker.dirty_rects(surface)
+    if rects:
+        pygame.display.update(rects)
@@ -0,0 +1,250 @@
+"""Running many environments in worker processes which share their buffers."""
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .constants import PlayerAction
+from .env import BombermanEnv, gymnasium
+from .observation import observation_shape
+
+# (name, shape, dtype) of a shared array, enough for a worker to attach to it
+_ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class SharedArray:
+    """
+    NumPy array whose memory lives in a `multiprocessing.shared_memory` block.
+
+    The process creating the array owns the block and unlinks it on `close`,
+    other processes attach to it through `spec` and only close their mapping.
+
+    Parameters
+    ----------
+    shape: Tuple[int, ...]
+        shape of the array
+    dtype: str
+        NumPy dtype of the array
+    name: Optional[str]
+        name of an existing block to attach to, a new block is created when not given
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: str, name: Optional[str] = None):
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.array: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf)
+        if self.owner:
+            self.array.fill(0)
+
+    @property
+    def spec(self) -> _ArraySpec:
+        """Everything needed to attach to the array from another process."""
+        return self.memory.name, self.array.shape, self.array.dtype.str
+
+    @classmethod
+    def attach(cls, spec: _ArraySpec) -> "SharedArray":
+        """
+        Attaches to an array created by another process.
+
+        Parameters
+        ----------
+        spec: Tuple[str, Tuple[int, ...], str]
+            `spec` of the array to attach to
+        """
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    def close(self):
+        """Releases the mapping and unlinks the block if this process created it."""
+        del self.array
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def _worker(connection: Connection, level_data: List, env_indices: range,
+            specs: Dict[str, _ArraySpec], env_kwargs: Dict):
+    # pylint: disable=too-many-locals
+    """
+    Steps the environments with the given indices of a vector env.
+
+    Commands arrive through the connection, actions are read from and results
+    are written to the shared arrays. Only the indices of finished episodes are
+    sent back.
+    """
+    buffers = {key: SharedArray.attach(spec) for key, spec in specs.items()}
+    actions = buffers["actions"].array
+    observations = buffers["observations"].array
+    final_observations = buffers["final_observations"].array
+    rewards = buffers["rewards"].array
+    terminated = buffers["terminated"].array
+    truncated = buffers["truncated"].array
+    envs = [BombermanEnv(level_data, **env_kwargs) for _ in env_indices]
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == "step":
+                finished = []
+                for index, env in zip(env_indices, envs):
+                    reward, env_terminated, env_truncated = env.advance(actions[index])
+                    rewards[index] = reward
+                    terminated[index] = env_terminated
+                    truncated[index] = env_truncated
+                    if env_terminated or env_truncated:
+                        env.observe(final_observations[index])
+                        env.reset()
+                        finished.append(index)
+                    env.observe(observations[index])
+                connection.send(finished)
+            elif command == "reset":
+                for index, env in zip(env_indices, envs):
+                    env.reset(seed=None if data is None else data + index)
+                    env.observe(observations[index])
+                connection.send(None)
+            else:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del actions, observations, final_observations, rewards, terminated, truncated
+        for buffer in buffers.values():
+            buffer.close()
+        connection.close()
+
+
+class SubprocessVectorEnv:
+    # pylint: disable=too-many-instance-attributes
+    """
+    Steps many `BombermanEnv` instances in lockstep, sharded over worker processes.
+
+    Every worker owns a contiguous slice of the environments. Actions,
+    observations, rewards and episode flags live in shared memory, so a step
+    only sends a short command to every worker and the list of finished episodes
+    back. Like `env.BombermanVectorEnv`, finished environments are reset within
+    the same step and their last observation is passed on in
+    `infos["final_observation"]`.
+
+    The returned arrays are views into the shared buffers, they are overwritten
+    by the next step.
+
+    Parameters
+    ----------
+    level_data: List
+        The Map layout used by all environments
+    num_envs: int
+        number of environments
+    num_workers: Optional[int]
+        number of worker processes, defaults to the number of CPUs
+    start_method: Optional[str]
+        multiprocessing start method, defaults to the platform default
+    kwargs:
+        passed on to every `BombermanEnv`
+    """
+
+    def __init__(self, level_data: List, num_envs: int, num_workers: Optional[int] = None,
+                 start_method: Optional[str] = None, **kwargs):
+        self.num_envs = num_envs
+        num_workers = min(num_workers or os.cpu_count() or 1, num_envs)
+        shape = (num_envs,) + observation_shape(level_data)
+        self._buffers = {
+            "actions": SharedArray((num_envs,), "int64"),
+            "observations": SharedArray(shape, "uint8"),
+            "final_observations": SharedArray(shape, "uint8"),
+            "rewards": SharedArray((num_envs,), "float32"),
+            "terminated": SharedArray((num_envs,), "bool"),
+            "truncated": SharedArray((num_envs,), "bool"),
+        }
+        self.actions = self._buffers["actions"].array
+        self.observations = self._buffers["observations"].array
+        self.final_observations = self._buffers["final_observations"].array
+        self.rewards = self._buffers["rewards"].array
+        self.terminated = self._buffers["terminated"].array
+        self.truncated = self._buffers["truncated"].array
+        specs = {key: buffer.spec for key, buffer in self._buffers.items()}
+
+        context: Any = multiprocessing.get_context(start_method)
+        self._connections: List[Connection] = []
+        self._processes: List[Any] = []
+        for worker in range(num_workers):
+            env_indices = range(worker * num_envs // num_workers,
+                                (worker + 1) * num_envs // num_workers)
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child_connection, level_data, env_indices,
+                                            specs, kwargs))
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+        self.closed = False
+
+        if gymnasium is not None:
+            self.single_action_space = gymnasium.spaces.Discrete(len(PlayerAction))
+            self.single_observation_space = gymnasium.spaces.Box(0, 255, shape[1:], np.uint8)
+            self.action_space = gymnasium.spaces.MultiDiscrete([len(PlayerAction)] * num_envs)
+            self.observation_space = gymnasium.spaces.Box(0, 255, shape, np.uint8)
+
+    def reset(self, *, seed: Optional[int] = None,
+              options: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
+        # pylint: disable=unused-argument
+        """
+        Resets all environments, environment i is seeded with seed + i.
+
+        Parameters
+        ----------
+        seed: Optional[int]
+            base seed of the environments
+        options: Optional[Dict]
+            unused, part of the gymnasium API
+        """
+        for connection in self._connections:
+            connection.send(("reset", seed))
+        for connection in self._connections:
+            connection.recv()
+        return self.observations, {}
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                    np.ndarray, Dict]:
+        """
+        Steps every environment with its action.
+
+        Parameters
+        ----------
+        actions: Sequence[int]
+            one `PlayerAction` value per environment
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]
+            observations, rewards, terminated, truncated and infos
+        """
+        self.actions[:] = actions
+        for connection in self._connections:
+            connection.send(("step", None))
+        final_observations: List[Optional[np.ndarray]] = [None] * self.num_envs
+        for connection in self._connections:
+            for index in connection.recv():
+                final_observations[index] = self.final_observations[index]
+        return (self.observations, self.rewards, self.terminated, self.truncated,
+                {"final_observation": final_observations})
+
+    def close(self):
+        """Stops the workers and releases the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self._connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        del self.actions, self.observations, self.final_observations
+        del self.rewards, self.terminated, self.truncated
+        for buffer in self._buffers.values():
+            buffer.close()
@@ -7,6 +7,7 @@ class Game(Enum):
     Constants related to general Game definitions.
     """
     TILE_SIZE = 32
+    FPS = 60
 
 class GameWindow(Enum):
     """
@@ -0,0 +1,103 @@
+"""Headless, fixed timestep simulation of a level."""
+from typing import FrozenSet, Iterable, List, Optional, Union
+import numpy as np
+from . import level
+
+
+class ScriptedControls:
+    """
+    Stand-in for `pygame.key.get_pressed` which reports a scripted set of keys.
+
+    Calling the object returns itself, indexing it with a pygame key constant
+    tells whether that key is pressed.
+    """
+
+    def __init__(self):
+        self.pressed: FrozenSet[int] = frozenset()
+
+    def press(self, keys: Iterable[int]):
+        """
+        Sets the keys which are pressed from now on.
+
+        Parameters
+        ----------
+        keys: Iterable[int]
+            pygame key constants, all other keys count as released
+        """
+        self.pressed = frozenset(keys)
+
+    def __call__(self) -> "ScriptedControls":
+        return self
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+class Simulation:
+    """
+    Runs the logic of a level without a window, rendering or frame pacing.
+
+    Every step advances the level by one fixed timestep of its tick clock, so the
+    simulation runs as fast as the CPU allows. The same map, seed and inputs
+    always lead to the same game.
+
+    Parameters
+    ----------
+    level_data: Union[List, np.ndarray]
+        The Map layout for the level, or the grid of a compiled map
+    level_number: int
+        Number of the level
+    seed: Optional[int]
+        Seed for the random parts of the level
+    """
+
+    def __init__(self, level_data: Union[List, np.ndarray], level_number: int = 1,
+                 seed: Optional[int] = None):
+        self.controls = ScriptedControls()
+        self.level = level.Level(level_data, None, level_number, seed=seed,
+                                 controls=self.controls)
+
+    @property
+    def ticks(self) -> int:
+        """Number of steps simulated so far."""
+        return self.level.clock.ticks
+
+    @property
+    def is_over(self) -> bool:
+        """Check if the player died or reached the gateway."""
+        return (self.level.player_hit_enemy or self.level.player_hit_explosion or
+                self.level.player_hit_gateway)
+
+    def step(self, pressed_keys: Iterable[int] = ()):
+        """
+        Advances the level by one timestep.
+
+        Parameters
+        ----------
+        pressed_keys: Iterable[int]
+            pygame key constants held down during this step
+        """
+        self.controls.press(pressed_keys)
+        self.level.step()
+
+    def run(self, inputs: Iterable[Iterable[int]]) -> int:
+        """
+        Steps the level once per entry of inputs until they run out or the game is over.
+
+        Parameters
+        ----------
+        inputs: Iterable[Iterable[int]]
+            pressed keys for every step
+
+        Returns
+        -------
+        int
+            number of steps taken
+        """
+        steps = 0
+        for pressed_keys in inputs:
+            if self.is_over:
+                break
+            self.step(pressed_keys)
+            steps += 1
+        return steps
@@ -1,5 +1,5 @@
 """Processing of a simple Tile of a game."""
-from typing import Tuple
+from typing import Optional, Tuple
 import random
 import pygame
 from .utils.fileutils import import_sprite
@@ -14,7 +14,8 @@ class Tile(pygame.sprite.Sprite):
     Attributes:
         pygame.sprite.Sprite
     """
-    def __init__(self, position: Tuple, destroyable: bool, tile_type: TileType):
+    def __init__(self, position: Tuple, destroyable: bool, tile_type: TileType,
+                 rng: Optional[random.Random] = None):
         """
         Initialize the tile.
 
@@ -29,21 +30,31 @@ class Tile(pygame.sprite.Sprite):
             to check if the wall is destroyable
         tile_type: TileType(Enum)
             to identify the type of tile in terms of explosion
+        rng: Optional[random.Random]
+            random number generator deciding whether the wall hides a bomb
         """
         super().__init__()
-        if destroyable:
-            self.image = import_sprite("graphics/destrWall.png")
-        else:
-            self.image = import_sprite("graphics/wall.png")
-        self.rect = self.image.get_rect(topleft=position)
         self.destroyable = destroyable
+        # hit once by an explosion, see `update_tile_type`
+        self.damaged = False
+        self.image = self._tile_image()
+        self.rect = self.image.get_rect(topleft=position)
         self.tile_type = tile_type
+        self.rng = rng if rng is not None else random.Random()
         self._init_hidden_bomb()
 
+    def _tile_image(self) -> pygame.Surface:
+        """graphics of the tile for its current damage"""
+        if self.damaged:
+            return import_sprite("graphics/destrWall_1.png")
+        if self.destroyable:
+            return import_sprite("graphics/destrWall.png")
+        return import_sprite("graphics/wall.png")
+
     def _init_hidden_bomb(self):
         """sets the internal field about whether the wall hides a bomb or not"""
         if self.tile_type == TileType.ONE_EXPLOSION_BOMB:
-            prob = random.random()
+            prob = self.rng.random()
             if prob < 0.5:
                 self.does_wall_contain_bomb = True
             else:
@@ -64,18 +75,24 @@ class Tile(pygame.sprite.Sprite):
             updated tile type
         """
         self.tile_type = to_tile_type
-        self.image = import_sprite("graphics/destrWall_1.png")
+        self.damaged = True
+        self.image = self._tile_image()
         self._init_hidden_bomb()
 
-    def update(self, level_shift: Tuple):
+    def get_state(self) -> Tuple[int, bool, bool]:
+        """Tile type value, hidden bomb and damage of the tile, see `set_state`."""
+        return self.tile_type.value, self.does_wall_contain_bomb, self.damaged
+
+    def set_state(self, state: Tuple[int, bool, bool]):
         """
-        Scrolls the tile in x and y direction to simulate camera movement
+        Puts the tile back into a state returned by `get_state`.
 
         Parameters
         ----------
 
-        scroll: Tuple
-            amount to scroll in the x and y direction
+        state: Tuple[int, bool, bool]
+            tile type value, whether the wall hides a bomb and whether it was damaged
         """
-        self.rect.x += level_shift[0]
-        self.rect.y += level_shift[1]
+        tile_type, self.does_wall_contain_bomb, self.damaged = state
+        self.tile_type = TileType(tile_type)
+        self.image = self._tile_image()
@@ -0,0 +1,118 @@
+"""Timed effects, eg. power ups, running out on the ticks of the simulation clock."""
+import heapq
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from .clock import TickClock
+
+
+class EffectTimers:
+    """
+    Expiry ticks of the active effects, kept in a min-heap.
+
+    `update` only looks at the top of the heap, so a tick without a due timer
+    costs a single comparison no matter how many effects are active. Timers are
+    keyed by any hashable, eg. (player, item type) when several players collect
+    power ups. Restarting an active timer either replaces its expiry or stacks
+    the new duration on top of the time left, the outdated heap entry is
+    skipped when it comes up.
+
+    Parameters
+    ----------
+    clock: TickClock
+        simulation clock the timers run on
+    on_expire: Callable[[Hashable], None]
+        called with the key of every timer which ran out
+    """
+
+    def __init__(self, clock: TickClock, on_expire: Callable[[Hashable], None]):
+        self.clock = clock
+        self.on_expire = on_expire
+        # (expiry tick, start order, key), entries of restarted timers stay until popped
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        # key -> (expiry tick, start order) of the active timers
+        self._active: Dict[Hashable, Tuple[int, int]] = {}
+        self._starts = 0
+
+    def start(self, key: Hashable, ticks: int, stack: bool = False):
+        """
+        Starts or restarts the timer of an effect.
+
+        Parameters
+        ----------
+        key: Hashable
+            the effect
+        ticks: int
+            number of ticks from now until the effect runs out
+        stack: bool
+            add the ticks to the time left of an active timer instead of restarting it
+        """
+        expiry = self.clock.ticks + ticks
+        active = self._active.get(key)
+        if stack and active is not None:
+            expiry = active[0] + ticks
+        self._push(key, expiry)
+
+    def cancel(self, key: Hashable):
+        """
+        Stops the timer of an effect without calling `on_expire`.
+
+        Parameters
+        ----------
+        key: Hashable
+            the effect
+        """
+        self._active.pop(key, None)
+
+    def remaining(self, key: Hashable) -> Optional[int]:
+        """
+        Ticks until the effect runs out.
+
+        Parameters
+        ----------
+        key: Hashable
+            the effect
+
+        Returns
+        -------
+        Optional[int]
+            None when the effect is not active
+        """
+        active = self._active.get(key)
+        if active is None:
+            return None
+        return active[0] - self.clock.ticks
+
+    def update(self):
+        """Ends the effects whose expiry tick was reached, in the order they run out."""
+        heap = self._heap
+        while heap and heap[0][0] <= self.clock.ticks:
+            expiry, order, key = heapq.heappop(heap)
+            if self._active.get(key) != (expiry, order):
+                # restarted or cancelled since this entry was pushed
+                continue
+            del self._active[key]
+            self.on_expire(key)
+
+    def get_state(self) -> Tuple[Tuple[Hashable, int], ...]:
+        """(key, expiry tick) of every active timer, in the order they run out."""
+        return tuple((key, expiry) for key, (expiry, _) in
+                     sorted(self._active.items(), key=lambda item: item[1]))
+
+    def set_state(self, state: Tuple[Tuple[Hashable, int], ...]):
+        """
+        Replaces the active timers with the ones returned by `get_state`.
+
+        Parameters
+        ----------
+        state: Tuple[Tuple[Hashable, int], ...]
+            (key, expiry tick) of every active timer
+        """
+        self._heap.clear()
+        self._active.clear()
+        for key, expiry in state:
+            self._push(key, expiry)
+
+    def _push(self, key: Hashable, expiry: int):
+        """makes expiry the current expiry tick of the timer"""
+        self._starts += 1
+        self._active[key] = (expiry, self._starts)
+        heapq.heappush(self._heap, (expiry, self._starts, key))
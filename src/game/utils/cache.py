@@ -0,0 +1,61 @@
+"""small keyed cache with optional least-recently-used eviction"""
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+_V = TypeVar("_V")
+
+
+class LRUCache(Generic[_V]):
+    """
+    Keyed cache which evicts the least recently used entry once full
+
+    Parameters
+    ----------
+    maxsize: Optional[int]
+        maximum number of entries kept, None for an unbounded cache
+    """
+    def __init__(self, maxsize: Optional[int] = None):
+        self._entries: "OrderedDict[Hashable, _V]" = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[_V]:
+        """returns the cached value for key (marking it as recently used) or None"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: _V):
+        """stores value under key, evicting the oldest entries if the cache is full"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def resize(self, maxsize: Optional[int]):
+        """changes the maximum size of the cache, evicting entries if required"""
+        self.maxsize = maxsize
+        self._evict()
+
+    def clear(self):
+        """removes every entry and resets the hit/miss counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self):
+        """drops least recently used entries until the size limit is honoured"""
+        if self.maxsize is None:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
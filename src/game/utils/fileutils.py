@@ -1,25 +1,40 @@
 """utility code related to file reading/writing like sprite, spritesheet loading"""
 # pylint: disable=cyclic-import
-from typing import List
+from typing import List, Optional, Tuple
 import pygame
+from .cache import LRUCache
+
+# decoded sprites are shared by every entity using them, the flag tracks whether the
+# surface was already converted to the display pixel format
+_SPRITE_CACHE: LRUCache[Tuple[pygame.Surface, bool]] = LRUCache()
+_SPRITESHEET_CACHE: LRUCache[Tuple[List[pygame.Surface], bool]] = LRUCache()
+
 
 def import_sprite(path: str) -> pygame.Surface:
     """
-    reads a single sprite from the specified location
+    reads a single sprite from the specified location, decoded sprites are cached
+    so the file is only read once
 
     Parameters
     ----------
     path: str
         path of the sprite
     """
-    return pygame.image.load(path)
+    cached = _SPRITE_CACHE.get(path)
+    if cached is not None and (cached[1] or not _is_display_ready()):
+        return cached[0]
+    sprite = cached[0] if cached is not None else pygame.image.load(path)
+    sprite, converted = _convert_to_display_format(sprite)
+    _SPRITE_CACHE.put(path, (sprite, converted))
+    return sprite
 
 def import_from_spritesheet(path: str, sprite_width: int,
                             sprite_height: int) -> List[pygame.Surface]:
     """
-    reads and returns a list of sprite(in surface format) corresponding to the 
-    individual sprites in the sprite sheet
-    
+    reads and returns a list of sprite(in surface format) corresponding to the
+    individual sprites in the sprite sheet, the frames are cached per sheet and
+    sprite size
+
     Parameters
     ----------
     path: str
@@ -29,6 +44,10 @@ def import_from_spritesheet(path: str, sprite_width: int,
     sprite_height: int
         height of the individual sprite in the spritesheet
     """
+    key = (path, sprite_width, sprite_height)
+    cached = _SPRITESHEET_CACHE.get(key)
+    if cached is not None and (cached[1] or not _is_display_ready()):
+        return list(cached[0])
     sprite_sheet = import_sprite(path)
     #sprite_width = PlayerBomberman.SPRITE_WIDTH
     #sprite_height = PlayerBomberman.SPRITE_HEIGHT
@@ -36,12 +55,48 @@ def import_from_spritesheet(path: str, sprite_width: int,
     num_frames = sprite_sheet.get_width() // sprite_width
 
     sprite_list = []
+    converted = True
 
     for i in range(num_frames):
         frame_rect = pygame.Rect(i * sprite_width, 0, sprite_width, sprite_height)
         frame_surface = pygame.Surface(frame_rect.size)
         frame_surface.blit(sprite_sheet, (0,0), frame_rect)
         frame_surface.set_colorkey((0,0,0))
+        frame_surface, frame_converted = _convert_to_display_format(frame_surface)
+        converted = converted and frame_converted
         sprite_list.append(frame_surface)
 
-    return sprite_list
+    _SPRITESHEET_CACHE.put(key, (sprite_list, converted))
+    return list(sprite_list)
+
+def set_asset_cache_size(maxsize: Optional[int]):
+    """
+    limits the number of sprites and spritesheets kept in memory
+
+    Parameters
+    ----------
+    maxsize: Optional[int]
+        maximum number of entries per cache, None to never evict
+    """
+    _SPRITE_CACHE.resize(maxsize)
+    _SPRITESHEET_CACHE.resize(maxsize)
+
+def clear_asset_cache():
+    """drops all cached sprites and spritesheets"""
+    _SPRITE_CACHE.clear()
+    _SPRITESHEET_CACHE.clear()
+
+def _is_display_ready() -> bool:
+    """surfaces can only be converted once a display mode has been set"""
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+def _convert_to_display_format(surface: pygame.Surface) -> Tuple[pygame.Surface, bool]:
+    """
+    converts the surface to the pixel format of the display so blits do not have
+    to convert it every frame, returns the surface and whether it was converted
+    """
+    if not _is_display_ready():
+        return surface, False
+    if surface.get_flags() & pygame.SRCALPHA: # pylint: disable=no-member
+        return surface.convert_alpha(), True
+    return surface.convert(), True
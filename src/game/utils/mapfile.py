@@ -0,0 +1,143 @@
+"""
+Compiled binary maps, a small header followed by one uint8 MapCell code per cell.
+
+Convert a csv map from the src folder:
+    python -m game.utils.mapfile maps/map_1.csv
+"""
+from pathlib import Path
+import csv
+import struct
+from typing import List, Optional, Union
+import fire  # type: ignore
+import numpy as np
+from ..constants import MapCell
+
+MAGIC = b"SBMP"
+VERSION = 1
+# magic, version, rows, columns, the cells follow right after it
+_HEADER = struct.Struct("<4sIII")
+# csv token of every MapCell code, indexed by the code
+_TOKENS = ('', 'W', '#', 'B_1', 'B_2', 'I', 'P')
+_CODES = {token: code for code, token in enumerate(_TOKENS)}
+
+
+def read_map(path: Union[str, Path]) -> List:
+    """
+    Parses a csv map.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        file of the map
+
+    Returns
+    -------
+    List
+        rows of map cells
+    """
+    with open(path, newline='', encoding="utf-8-sig") as file:
+        return list(csv.reader(file))
+
+
+def encode_layout(layout: List) -> np.ndarray:
+    """
+    Encodes the tokens of a csv map as MapCell codes.
+
+    Parameters
+    ----------
+    layout: List
+        rows of map cells, shorter rows are padded with empty cells
+
+    Returns
+    -------
+    np.ndarray
+        uint8 (rows, columns) grid of MapCell codes
+    """
+    columns = max(len(row) for row in layout)
+    grid = np.full((len(layout), columns), MapCell.EMPTY.value, dtype=np.uint8)
+    for row_index, row in enumerate(layout):
+        try:
+            grid[row_index, :len(row)] = [_CODES[token] for token in row]
+        except KeyError as error:
+            raise ValueError(f"unknown map cell {error.args[0]!r} in row {row_index}") from error
+    return grid
+
+
+def decode_grid(grid: np.ndarray) -> List[List[str]]:
+    """
+    Turns a grid of MapCell codes back into rows of csv tokens.
+
+    Parameters
+    ----------
+    grid: np.ndarray
+        (rows, columns) grid of MapCell codes
+    """
+    return np.array(_TOKENS, dtype=object)[grid].tolist()
+
+
+def write_binary_map(path: Union[str, Path], grid: np.ndarray):
+    """
+    Writes a grid of MapCell codes as compiled map.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        file the map is written to
+    grid: np.ndarray
+        (rows, columns) grid of MapCell codes
+    """
+    rows, columns = grid.shape
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, rows, columns))
+        file.write(np.ascontiguousarray(grid, dtype=np.uint8).tobytes())
+
+
+def load_binary_map(path: Union[str, Path]) -> np.ndarray:
+    """
+    Memory maps a compiled map, the cells are only read from disk when used.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        file of the compiled map
+
+    Returns
+    -------
+    np.ndarray
+        read only uint8 (rows, columns) grid of MapCell codes backed by the file
+    """
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a compiled map")
+    magic, version, rows, columns = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a compiled map of version {VERSION}")
+    if Path(path).stat().st_size != _HEADER.size + rows * columns:
+        raise ValueError(f"{path} does not hold {rows}x{columns} cells")
+    return np.memmap(path, dtype=np.uint8, mode="r", offset=_HEADER.size, shape=(rows, columns))
+
+
+def convert_csv_map(csv_path: str, binary_path: Optional[str] = None) -> str:
+    """
+    Compiles a csv map.
+
+    Parameters
+    ----------
+    csv_path: str
+        csv map to convert
+    binary_path: Optional[str]
+        file of the compiled map, next to the csv map with a .bmap suffix by default
+
+    Returns
+    -------
+    str
+        file of the compiled map
+    """
+    target = Path(binary_path) if binary_path is not None else Path(csv_path).with_suffix(".bmap")
+    write_binary_map(target, encode_layout(read_map(csv_path)))
+    return str(target)
+
+
+if __name__ == "__main__":
+    fire.Fire(convert_csv_map)
@@ -0,0 +1,70 @@
+"""Generating synthetic map layouts, eg. for benchmarks on large maps."""
+import csv
+import random
+from typing import List, Optional
+
+
+def generate_map(columns: int, rows: int, seed: Optional[int] = None,
+                 breakable: float = 0.35, items: float = 0.02) -> List[List[str]]:
+    """
+    Builds a layout in the format of the csv maps.
+
+    The map is framed by unbreakable walls with a pillar on every cell whose row
+    and column are even, like the classic bomberman arena. The player starts in
+    the top left corner, the other cells are breakable walls, walls hiding an
+    item or empty.
+
+    Parameters
+    ----------
+    columns: int
+        width of the map in cells
+    rows: int
+        height of the map in cells
+    seed: Optional[int]
+        seed for the placement of the breakable walls and items
+    breakable: float
+        probability of a free cell holding a breakable wall
+    items: float
+        probability of a free cell holding a wall with an item
+
+    Returns
+    -------
+    List[List[str]]
+        rows of map cells like the ones read from a csv map
+    """
+    rng = random.Random(seed)
+    layout = []
+    for row in range(rows):
+        cells = []
+        for column in range(columns):
+            if (row in (0, rows - 1) or column in (0, columns - 1) or
+                    (row % 2 == 0 and column % 2 == 0)):
+                cells.append('#')
+            elif row + column <= 3:
+                cells.append('')
+            else:
+                roll = rng.random()
+                if roll < items:
+                    cells.append('I')
+                elif roll < items + breakable:
+                    cells.append(rng.choice(('B_1', 'B_2')))
+                else:
+                    cells.append('')
+        layout.append(cells)
+    layout[1][1] = 'P'
+    return layout
+
+
+def write_map(path: str, layout: List[List[str]]):
+    """
+    Writes a layout as a csv map, it can be read back like the maps in the maps folder.
+
+    Parameters
+    ----------
+    path: str
+        file the map is written to
+    layout: List[List[str]]
+        rows of map cells
+    """
+    with open(path, "w", newline='', encoding="utf-8-sig") as file:
+        csv.writer(file).writerows(layout)
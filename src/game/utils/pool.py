@@ -0,0 +1,57 @@
+"""free list of objects which are recycled instead of rebuilt"""
+from typing import Callable, Generic, List, TypeVar
+
+_T = TypeVar("_T")
+
+
+class Pool(Generic[_T]):
+    """
+    Hands out recycled objects, only building new ones when none are free
+
+    Parameters
+    ----------
+    factory: Callable[..., _T]
+        builds a new object from the arguments given to `acquire`
+    reset: Callable[..., None]
+        re-initialises a recycled object in place, called with the object
+        followed by the arguments given to `acquire`
+    """
+    def __init__(self, factory: Callable[..., _T], reset: Callable[..., None]):
+        self._factory = factory
+        self._reset = reset
+        self._free: List[_T] = []
+        self.allocations = 0
+        self.reuses = 0
+        self.releases = 0
+
+    def acquire(self, *args) -> _T:
+        """returns a free object reset with args, or a new one if none is free"""
+        if self._free:
+            item = self._free.pop()
+            self._reset(item, *args)
+            self.reuses += 1
+            return item
+        self.allocations += 1
+        return self._factory(*args)
+
+    def release(self, item: _T):
+        """gives an object back to the pool, it must not be used afterwards"""
+        self._free.append(item)
+        self.releases += 1
+
+    @property
+    def free(self) -> int:
+        """number of objects waiting to be reused"""
+        return len(self._free)
+
+    @property
+    def in_use(self) -> int:
+        """number of objects handed out and not released yet"""
+        return self.allocations + self.reuses - self.releases
+
+    def clear(self):
+        """drops the free objects and resets the counters"""
+        self._free.clear()
+        self.allocations = 0
+        self.reuses = 0
+        self.releases = 0
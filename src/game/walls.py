@@ -0,0 +1,175 @@
+"""Sprite group for the level tiles, indexed by their grid cell."""
+from typing import Callable, List, Optional, Set, Tuple
+import pygame
+from .broadphase import Cell, SpatialGroup
+from .render import RenderQueue
+from .settings import Game
+from .tile import Tile
+from .utils.cache import LRUCache
+
+# width and height of a chunk of the wall layer in cells
+CHUNK_CELLS = 16
+
+
+class WallGroup(SpatialGroup):
+    """
+    Group holding the walls of a level.
+
+    Walls are grid aligned, so every wall sits alone in the bucket of the cell it
+    occupies and looking up the wall at a position is O(1) instead of a scan
+    over all walls. Listeners are told about every cell whose wall was added,
+    removed or changed its graphics.
+    """
+
+    def __init__(self, *sprites):
+        self._listeners: List[Callable[[Cell], None]] = []
+        super().__init__(*sprites)
+
+    def add_listener(self, callback: Callable[[Cell], None]):
+        """
+        Registers a callback which receives the cell of every changed wall.
+
+        Parameters
+        ----------
+        callback: Callable[[Cell], None]
+            called with the (column, row) cell of the wall
+        """
+        self._listeners.append(callback)
+
+    def add_internal(self, sprite, layer=None):
+        """Adds the sprite to the group and tells the listeners about it."""
+        super().add_internal(sprite, layer)
+        if self._listeners:
+            self.mark_changed(sprite)
+
+    def remove_internal(self, sprite):
+        """Removes the sprite from the group and tells the listeners about it."""
+        super().remove_internal(sprite)
+        self.mark_changed(sprite)
+
+    def mark_changed(self, wall: Tile):
+        """
+        Tells the listeners that the given wall changed, eg. its tile type.
+
+        Parameters
+        ----------
+        wall: Tile
+            the changed wall
+        """
+        cell = self.cell_of(wall.rect.topleft)
+        for callback in self._listeners:
+            callback(cell)
+
+    def cell_of(self, position) -> Tuple[int, int]:
+        """
+        Grid cell (column, row) containing the given position.
+
+        Parameters
+        ----------
+        position: Tuple
+            x,y world co-ordinates
+        """
+        return (position[0] // Game.TILE_SIZE.value,
+                position[1] // Game.TILE_SIZE.value)
+
+    def wall_at(self, position) -> Optional[Tile]:
+        """
+        Wall whose top left corner is exactly at the given position, if any.
+
+        Parameters
+        ----------
+        position: Tuple
+            x,y world co-ordinates
+        """
+        for wall in self.spatial_hash.at_cell(self.cell_of(position)):
+            if wall.rect.x == position[0] and wall.rect.y == position[1]:
+                return wall
+        return None
+
+
+class WallLayer:
+    """
+    Pre-rendered images of the walls of a level, in square chunks of cells.
+
+    A chunk is drawn the first time it becomes visible, afterwards only the cells
+    reported by the wall group are redrawn. Every frame the visible parts of the
+    few chunks overlapping the viewport are blitted, so drawing the walls and the
+    memory held for them follow the screen size instead of the map size. The
+    least recently drawn chunks are dropped once more than `max_chunks` are kept.
+
+    Parameters
+    ----------
+    walls: WallGroup
+        walls of the level
+    size: Tuple[int, int]
+        size of the whole map in pixels
+    max_chunks: Optional[int]
+        number of rendered chunks kept, raised when the viewport needs more of them
+    """
+
+    def __init__(self, walls: WallGroup, size: Tuple[int, int], max_chunks: Optional[int] = 64):
+        self.walls = walls
+        self.size = size
+        self.chunk_size = CHUNK_CELLS * Game.TILE_SIZE.value
+        self._chunks: LRUCache[pygame.Surface] = LRUCache(max_chunks)
+        self._dirty_cells: Set[Cell] = set()
+        walls.add_listener(self._dirty_cells.add)
+
+    def redraw_dirty_cells(self):
+        """Redraws the cells whose walls changed since the last call, in the chunks kept."""
+        tile_size = Game.TILE_SIZE.value
+        for column, row in self._dirty_cells:
+            chunk = self._chunks.get((column // CHUNK_CELLS, row // CHUNK_CELLS))
+            if chunk is None:
+                # drawn from scratch once it becomes visible again
+                continue
+            left = (column // CHUNK_CELLS) * self.chunk_size
+            top = (row // CHUNK_CELLS) * self.chunk_size
+            chunk.fill((0, 0, 0, 0), (column * tile_size - left, row * tile_size - top,
+                                      tile_size, tile_size))
+            for wall in self.walls.spatial_hash.at_cell((column, row)):
+                chunk.blit(wall.image, (wall.rect.x - left, wall.rect.y - top))
+        self._dirty_cells.clear()
+
+    def collect(self, queue: RenderQueue, viewport: pygame.Rect):
+        """
+        Queues the visible part of the walls.
+
+        Parameters
+        ----------
+        queue: RenderQueue
+            draw calls of the frame
+        viewport: pygame.Rect
+            visible part of the map in world co-ordinates
+        """
+        self.redraw_dirty_cells()
+        area = viewport.clip(pygame.Rect((0, 0), self.size))
+        if area.width == 0 or area.height == 0:
+            return
+        chunk_size = self.chunk_size
+        keys = [(chunk_column, chunk_row)
+                for chunk_row in range(area.top // chunk_size, (area.bottom - 1) // chunk_size + 1)
+                for chunk_column in range(area.left // chunk_size,
+                                          (area.right - 1) // chunk_size + 1)]
+        if self._chunks.maxsize is not None and len(keys) > self._chunks.maxsize:
+            self._chunks.resize(len(keys))
+        for key in keys:
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._render_chunk(key)
+                self._chunks.put(key, chunk)
+            chunk_rect = pygame.Rect(key[0] * chunk_size, key[1] * chunk_size,
+                                     chunk_size, chunk_size)
+            part = area.clip(chunk_rect)
+            queue.add(chunk.subsurface(part.move(-chunk_rect.x, -chunk_rect.y)),
+                      (part.x - viewport.x, part.y - viewport.y))
+
+    def _render_chunk(self, key: Cell) -> pygame.Surface:
+        """draws the walls of a chunk onto a surface of its own"""
+        # pylint: disable=no-member
+        chunk_size = self.chunk_size
+        chunk_rect = pygame.Rect(key[0] * chunk_size, key[1] * chunk_size, chunk_size, chunk_size)
+        chunk = pygame.Surface(chunk_rect.size, pygame.SRCALPHA)
+        for wall in self.walls.spatial_hash.query(chunk_rect):
+            chunk.blit(wall.image, (wall.rect.x - chunk_rect.x, wall.rect.y - chunk_rect.y))
+        return chunk